@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+import json
+import os
+import sqlite3
+import sys
+
+
+def main() -> int:
+    db = os.environ.get("CATALOG_DB") or "catalog.sqlite"
+    if not os.path.isfile(db):
+        print(f"missing {db}", file=sys.stderr)
+        return 1
+
+    con = sqlite3.connect(db)
+    con.execute("PRAGMA busy_timeout=30000")
+
+    total = 0
+    for table in ("movies", "series"):
+        cols = {r[1] for r in con.execute(f"PRAGMA table_info({table})")}
+        if not cols or "genres" not in cols:
+            continue
+        if "genres_json" not in cols:
+            con.execute(f"ALTER TABLE {table} ADD COLUMN genres_json TEXT")
+        rows = con.execute(f"SELECT id, genres FROM {table} WHERE genres IS NOT NULL AND genres<>''").fetchall()
+        updates = [
+            (json.dumps([t.strip() for t in g.split(",") if t.strip()], ensure_ascii=False, separators=(",", ":")), i)
+            for (i, g) in rows
+        ]
+        con.executemany(f"UPDATE {table} SET genres_json=? WHERE id=?", updates)
+        total += len(updates)
+
+    con.commit()
+    con.close()
+    print(f"genres_json backfilled rows={total}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+import sys
+
+
+def main() -> int:
+    db = os.environ.get("CATALOG_DB") or "catalog.sqlite"
+    if not os.path.isfile(db):
+        print(f"missing {db}", file=sys.stderr)
+        return 1
+
+    con = sqlite3.connect(db)
+    con.execute("PRAGMA busy_timeout=30000")
+
+    rows = []
+    for table in ("movies", "series"):
+        cols = {r[1] for r in con.execute(f"PRAGMA table_info({table})")}
+        if not cols:
+            print(f"missing {table} table", file=sys.stderr)
+            return 1
+        if "pop_rank" not in cols:
+            con.execute(f"ALTER TABLE {table} ADD COLUMN pop_rank INTEGER")
+        rows.extend(
+            (table, int(r[0]), float(r[1] or 0.0))
+            for r in con.execute(f"SELECT id, popularity FROM {table}")
+        )
+
+    rows.sort(key=lambda t: -t[2])
+    updates = {"movies": [], "series": []}
+    for rank, (table, tid, _pop) in enumerate(rows):
+        updates[table].append((rank, tid))
+
+    con.execute("BEGIN")
+    for table, batch in updates.items():
+        con.executemany(f"UPDATE {table} SET pop_rank=? WHERE id=?", batch)
+        con.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_pop_rank ON {table}(pop_rank)")
+    con.execute("COMMIT")
+    con.close()
+
+    print(f"pop_rank assigned rows={len(rows)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
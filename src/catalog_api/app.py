@@ -1,14 +1,43 @@
 import json
 import os
+import queue
 import sqlite3
 import ssl
+import sys
 import time
 from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
-from threading import Lock, local
+from threading import Lock, Thread, local
 from urllib.request import HTTPSHandler, ProxyHandler, Request, build_opener
 
 from .lang import _lang_tag
-from .util import _load_dotenv, _pick_logo, _year
+from .util import _load_dotenv, _pick_best_logo, _pick_logo, _pick_logo_parsed, _year
+
+try:
+    import urllib3 as _urllib3
+except Exception:
+    _urllib3 = None
+
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
+
+def _loads(raw: bytes):
+    if _orjson:
+        return _orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def _dumps_compact(obj) -> str:
+    if _orjson:
+        return _orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+_MOVIE = sys.intern("movie")
+_TV = sys.intern("tv")
+_SERIES = sys.intern("series")
 
 
 class _TokenBucket:
@@ -16,14 +45,14 @@ class _TokenBucket:
         self.rate = float(rate)
         self.capacity = float(capacity if capacity is not None else rate)
         self.tokens = self.capacity
-        self.t = time.time()
+        self.t = time.monotonic()
         self.lock = Lock()
 
     def acquire(self, n: float = 1.0):
         if self.rate <= 0:
             return
         while True:
-            now = time.time()
+            now = time.monotonic()
             with self.lock:
                 dt = now - self.t
                 if dt > 0:
@@ -55,9 +84,11 @@ class App:
         file_proxy = (file_env.get("TMDB_PROXY") or "").strip()
         self.tmdb_proxy = env_proxy or file_proxy
         self._tmdb_opener = None
+        self._tmdb_pool = None
         self.home_cache: dict[str, tuple] = {}
         self.home_lock = Lock()
         self.home_ttl_s = 90 * 60
+        self.home_refresh_inflight: set[str] = set()
         self.trending_cache: dict[tuple[str, str], tuple[float, list]] = {}
         self.trending_lock = Lock()
         self.trending_ttl_s = 90 * 60
@@ -67,6 +98,15 @@ class App:
         self.backfill_recent: dict[tuple[str, int, str, int], float] = {}
         self.backfill_lock = Lock()
         self.backfill_ttl_s = 10 * 60
+        self.miss_cache: dict[tuple[str, int], float] = {}
+        self.miss_lock = Lock()
+        self.miss_ttl_s = 5 * 60
+        self.logos_parsed: dict[tuple[str, int], dict | None] = {}
+        self.logos_lock = Lock()
+        self.browse_cache: dict[tuple[str, int, str], tuple] = {}
+        self.search_page_cache: dict[str, tuple] = {}
+        self.browse_lock = Lock()
+        self.browse_ttl_s = 5 * 60
         self.tmdb_rps = float(os.environ.get("TMDB_RPS") or "47")
         fg_default = 7.0
         fg_cfg = float(os.environ.get("TMDB_RPS_FOREGROUND") or fg_default)
@@ -77,9 +117,13 @@ class App:
         self.tmdb_tls = local()
         self.backfill_workers = int(os.environ.get("BACKFILL_WORKERS") or "8")
         self.backfill_ex = ThreadPoolExecutor(max_workers=max(1, self.backfill_workers))
+        self.tmdb_ex = ThreadPoolExecutor(max_workers=int(os.environ.get("TMDB_WORKERS") or "4"))
+        self.compress_ex = ThreadPoolExecutor(max_workers=1)
         self.backfill_inflight: set[tuple[str, int, str, int]] = set()
         self.backfill_queue_limit = int(os.environ.get("BACKFILL_QUEUE_LIMIT") or "2000")
         self.tmdb_init_lock = Lock()
+        self._tls_con = local()
+        self._write_q: queue.Queue = queue.Queue()
 
         con = sqlite3.connect(self.db_path)
         try:
@@ -107,6 +151,123 @@ class App:
             self.has_episodes = (
                 con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='tv_episodes'").fetchone() is not None
             )
+            self.has_pop_rank = False
+            if "pop_rank" in self.movies_cols and "pop_rank" in self.series_cols:
+                total = con.execute("SELECT (SELECT COUNT(*) FROM movies) + (SELECT COUNT(*) FROM series)").fetchone()[0]
+                unranked = con.execute(
+                    "SELECT (SELECT COUNT(*) FROM movies WHERE pop_rank IS NULL)"
+                    " + (SELECT COUNT(*) FROM series WHERE pop_rank IS NULL)"
+                ).fetchone()[0]
+                # rows added since the last ranking sort dead last; only trust
+                # the rank ordering while they stay a sliver of the catalog
+                self.has_pop_rank = total > 0 and unranked * 20 <= total
+        finally:
+            con.close()
+
+        self._ensure_indexes()
+        self._ensure_fts()
+        Thread(target=self._writer_loop, daemon=True).start()
+
+    def _ensure_indexes(self):
+        con = sqlite3.connect(self.db_path)
+        try:
+            if self.has_translations:
+                con.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_tt_cov ON "
+                    "title_translations(media_type, tmdb_id, iso_639_1, iso_3166_1, title, overview)"
+                )
+            if self.has_cast:
+                con.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_title_cast_lookup ON "
+                    "title_cast(media_type, tmdb_id, ord, name, character, profile_path)"
+                )
+            if self.has_episodes:
+                con.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_tv_episodes_cov ON "
+                    "tv_episodes(series_id, season_number, episode_number, name, runtime, still_path)"
+                )
+            con.commit()
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            con.close()
+
+    def _ensure_fts(self):
+        self.has_fts = False
+        con = sqlite3.connect(self.db_path)
+        try:
+            con.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5("
+                "media_type UNINDEXED, tmdb_id UNINDEXED, src UNINDEXED, lang UNINDEXED, title, overview, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            con.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS movies_fts_ai AFTER INSERT ON movies BEGIN
+                  DELETE FROM catalog_fts WHERE media_type='movie' AND tmdb_id=new.id AND src='base';
+                  INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview)
+                  VALUES('movie', new.id, 'base', '', COALESCE(new.title,''), COALESCE(new.overview,''));
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_fts_au AFTER UPDATE OF title, overview ON movies BEGIN
+                  DELETE FROM catalog_fts WHERE media_type='movie' AND tmdb_id=new.id AND src='base';
+                  INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview)
+                  VALUES('movie', new.id, 'base', '', COALESCE(new.title,''), COALESCE(new.overview,''));
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_fts_ad AFTER DELETE ON movies BEGIN
+                  DELETE FROM catalog_fts WHERE media_type='movie' AND tmdb_id=old.id AND src='base';
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_ai AFTER INSERT ON series BEGIN
+                  DELETE FROM catalog_fts WHERE media_type='tv' AND tmdb_id=new.id AND src='base';
+                  INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview)
+                  VALUES('tv', new.id, 'base', '', COALESCE(new.name,''), COALESCE(new.overview,''));
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_au AFTER UPDATE OF name, overview ON series BEGIN
+                  DELETE FROM catalog_fts WHERE media_type='tv' AND tmdb_id=new.id AND src='base';
+                  INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview)
+                  VALUES('tv', new.id, 'base', '', COALESCE(new.name,''), COALESCE(new.overview,''));
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_ad AFTER DELETE ON series BEGIN
+                  DELETE FROM catalog_fts WHERE media_type='tv' AND tmdb_id=old.id AND src='base';
+                END;
+                """
+            )
+            if self.has_translations:
+                con.executescript(
+                    """
+                    CREATE TRIGGER IF NOT EXISTS tt_fts_ai AFTER INSERT ON title_translations BEGIN
+                      DELETE FROM catalog_fts WHERE media_type=new.media_type AND tmdb_id=new.tmdb_id AND src='tr' AND lang=new.iso_639_1;
+                      INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview)
+                      VALUES(new.media_type, new.tmdb_id, 'tr', new.iso_639_1, COALESCE(new.title,''), COALESCE(new.overview,''));
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS tt_fts_au AFTER UPDATE ON title_translations BEGIN
+                      DELETE FROM catalog_fts WHERE media_type=new.media_type AND tmdb_id=new.tmdb_id AND src='tr' AND lang=new.iso_639_1;
+                      INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview)
+                      VALUES(new.media_type, new.tmdb_id, 'tr', new.iso_639_1, COALESCE(new.title,''), COALESCE(new.overview,''));
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS tt_fts_ad AFTER DELETE ON title_translations BEGIN
+                      DELETE FROM catalog_fts WHERE media_type=old.media_type AND tmdb_id=old.tmdb_id AND src='tr' AND lang=old.iso_639_1;
+                    END;
+                    """
+                )
+            if con.execute("SELECT 1 FROM catalog_fts LIMIT 1").fetchone() is None:
+                con.execute(
+                    "INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview) "
+                    "SELECT 'movie', id, 'base', '', COALESCE(title,''), COALESCE(overview,'') FROM movies"
+                )
+                con.execute(
+                    "INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview) "
+                    "SELECT 'tv', id, 'base', '', COALESCE(name,''), COALESCE(overview,'') FROM series"
+                )
+                if self.has_translations:
+                    con.execute(
+                        "INSERT INTO catalog_fts(media_type,tmdb_id,src,lang,title,overview) "
+                        "SELECT media_type, tmdb_id, 'tr', iso_639_1, COALESCE(title,''), COALESCE(overview,'') "
+                        "FROM title_translations WHERE COALESCE(title,'')<>'' OR COALESCE(overview,'')<>''"
+                    )
+            con.commit()
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
         finally:
             con.close()
 
@@ -117,6 +278,21 @@ class App:
             self.tmdb_bg_limiter.acquire(1)
         else:
             self.tmdb_fg_limiter.acquire(1)
+        if _urllib3:
+            if self._tmdb_pool is None:
+                with self.tmdb_init_lock:
+                    if self._tmdb_pool is None:
+                        if self.tmdb_proxy:
+                            self._tmdb_pool = _urllib3.ProxyManager(self.tmdb_proxy, num_pools=4, maxsize=32, retries=False)
+                        else:
+                            self._tmdb_pool = _urllib3.PoolManager(num_pools=4, maxsize=32, retries=False)
+            return self._tmdb_pool.request(
+                "GET",
+                url,
+                headers={"accept": "application/json"},
+                timeout=timeout_s,
+                preload_content=False,
+            )
         if self._tmdb_opener is None:
             with self.tmdb_init_lock:
                 if self._tmdb_opener is None:
@@ -140,7 +316,7 @@ class App:
                 st = getattr(resp, "status", None)
                 if st != 200:
                     return (st, None)
-                data = json.loads(resp.read().decode("utf-8"))
+                data = _loads(resp.read())
                 return (st, data if isinstance(data, dict) else None)
         except Exception:
             return (None, None)
@@ -156,19 +332,18 @@ class App:
             )
             return (mt, st, data)
 
-        with ThreadPoolExecutor(max_workers=2) as ex:
-            f_movie = ex.submit(fetch, "movie")
-            f_tv = ex.submit(fetch, "tv")
-            done, pending = wait((f_movie, f_tv), return_when=FIRST_COMPLETED)
-            first = next(iter(done)).result()
-            if first[1] == 200 and first[2]:
-                for p in pending:
-                    p.cancel()
-                return first
-            other = next(iter(pending)).result()
-            if other[1] == 200 and other[2]:
-                return other
-            return first if first[1] == 200 else other
+        f_movie = self.tmdb_ex.submit(fetch, "movie")
+        f_tv = self.tmdb_ex.submit(fetch, "tv")
+        done, pending = wait((f_movie, f_tv), return_when=FIRST_COMPLETED)
+        first = next(iter(done)).result()
+        if first[1] == 200 and first[2]:
+            for p in pending:
+                p.cancel()
+            return first
+        other = next(iter(pending)).result()
+        if other[1] == 200 and other[2]:
+            return other
+        return first if first[1] == 200 else other
 
     def _missing_parts(self, con: sqlite3.Connection, media_type: str, tid: int, iso639: str, iso3166: str | None, full: bool):
         if not self.tmdb_key or media_type not in ("movie", "tv") or tid <= 0:
@@ -232,12 +407,12 @@ class App:
             return
         lang_tag = _lang_tag(iso639, iso3166)
         k = (media_type, tid, lang_tag, 1 if full else 0)
-        now = time.time()
+        now = time.monotonic()
         with self.backfill_lock:
             t0 = self.backfill_recent.get(k)
-            if t0 and (now - t0) < self.backfill_ttl_s:
+            if t0 and t0 > now:
                 return
-            self.backfill_recent[k] = now
+            self.backfill_recent[k] = now + self.backfill_ttl_s
             if len(self.backfill_inflight) >= self.backfill_queue_limit or k in self.backfill_inflight:
                 return
             self.backfill_inflight.add(k)
@@ -269,8 +444,9 @@ class App:
                 if miss.get("need_translations"):
                     self._upsert_tmdb_translations(con, media_type, tid)
                 con.commit()
+                with self.miss_lock:
+                    self.miss_cache.pop((media_type, tid), None)
             finally:
-                con.close()
                 self.tmdb_tls.bg = False
                 with self.backfill_lock:
                     self.backfill_inflight.discard(k)
@@ -289,7 +465,8 @@ class App:
             popularity = data.get("popularity")
             poster_path = data.get("poster_path") or None
             backdrop_path = data.get("backdrop_path") or None
-            genres = ", ".join(g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")) or None
+            genre_names = [g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")]
+            genres = ", ".join(genre_names) or None
 
             cols = self.movies_cols
             fields = ["id"]
@@ -309,6 +486,7 @@ class App:
             add("poster_path", poster_path)
             add("backdrop_path", backdrop_path)
             add("genres", genres)
+            add("genres_json", _dumps_compact(genre_names) if genre_names else None)
 
             set_cols = [c for c in fields if c != "id"]
             sql = f"""
@@ -326,7 +504,8 @@ class App:
         popularity = data.get("popularity")
         poster_path = data.get("poster_path") or None
         backdrop_path = data.get("backdrop_path") or None
-        genres = ", ".join(g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")) or None
+        genre_names = [g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")]
+        genres = ", ".join(genre_names) or None
         networks = ", ".join(n.get("name") for n in (data.get("networks") or []) if isinstance(n, dict) and n.get("name")) or None
         number_of_seasons = data.get("number_of_seasons")
         number_of_episodes = data.get("number_of_episodes")
@@ -349,6 +528,7 @@ class App:
         add("poster_path", poster_path)
         add("backdrop_path", backdrop_path)
         add("genres", genres)
+        add("genres_json", _dumps_compact(genre_names) if genre_names else None)
         add("networks", networks)
         add("number_of_seasons", number_of_seasons)
         add("number_of_episodes", number_of_episodes)
@@ -393,11 +573,13 @@ class App:
             by_lang = harvest(idata) if (st_i == 200 and idata) else None
         if not by_lang:
             return
-        j = json.dumps(by_lang, ensure_ascii=False, separators=(",", ":"))
+        j = _dumps_compact(by_lang)
         if media_type == "movie":
             con.execute("UPDATE movies SET logos_json=? WHERE id=?", (j, tid))
         else:
             con.execute("UPDATE series SET logos_json=? WHERE id=?", (j, tid))
+        with self.logos_lock:
+            self.logos_parsed.pop((media_type, tid), None)
 
     def _upsert_tmdb_videos(self, con: sqlite3.Connection, media_type: str, tid: int, lang_tag: str):
         if not self.has_videos:
@@ -519,7 +701,26 @@ class App:
                 (media_type, tid, iso_639_1, iso_3166_1, title, overview, tagline, homepage),
             )
 
-    def _upsert_tmdb_tv_seasons_episodes(self, con: sqlite3.Connection, tid: int, lang_tag: str, data: dict):
+    def _tmdb_first_season(self, tid: int, lang_tag: str, data: dict):
+        sn = None
+        for s in data.get("seasons") or []:
+            if not isinstance(s, dict):
+                continue
+            x = int(s.get("season_number") or 0)
+            if x > 0:
+                sn = x
+                break
+        if sn is None:
+            return (None, None)
+        st_s, sdata = self._tmdb_get_json(
+            f"https://api.themoviedb.org/3/tv/{tid}/season/{sn}?api_key={self.tmdb_key}&language={lang_tag}",
+            12,
+        )
+        if st_s != 200 or not sdata:
+            return (sn, None)
+        return (sn, sdata)
+
+    def _upsert_tmdb_tv_seasons_episodes(self, con: sqlite3.Connection, tid: int, lang_tag: str, data: dict, season: tuple | None = None):
         if self.has_seasons:
             seasons = data.get("seasons") or []
             if isinstance(seasons, list):
@@ -555,21 +756,8 @@ class App:
 
         if not self.has_episodes:
             return
-        sn = None
-        for s in data.get("seasons") or []:
-            if not isinstance(s, dict):
-                continue
-            x = int(s.get("season_number") or 0)
-            if x > 0:
-                sn = x
-                break
-        if sn is None:
-            return
-        st_s, sdata = self._tmdb_get_json(
-            f"https://api.themoviedb.org/3/tv/{tid}/season/{sn}?api_key={self.tmdb_key}&language={lang_tag}",
-            12,
-        )
-        if st_s != 200 or not sdata:
+        sn, sdata = season if season is not None else self._tmdb_first_season(tid, lang_tag, data)
+        if sn is None or not sdata:
             return
         for ep in sdata.get("episodes") or []:
             if not isinstance(ep, dict):
@@ -606,26 +794,73 @@ class App:
                 ),
             )
 
+    def _writer_loop(self):
+        while True:
+            ops = [self._write_q.get()]
+            deadline = time.monotonic() + 0.05
+            while len(ops) < 64:
+                try:
+                    ops.append(self._write_q.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            for attempt in range(5):
+                con = None
+                try:
+                    con = self._con()
+                    for op in ops:
+                        op(con)
+                    con.commit()
+                    break
+                except sqlite3.OperationalError:
+                    if con is not None:
+                        try:
+                            con.rollback()
+                        except Exception:
+                            pass
+                    time.sleep(0.05 * (attempt + 1))
+                except Exception:
+                    if con is not None:
+                        try:
+                            con.rollback()
+                        except Exception:
+                            pass
+                    break
+
+    def _enqueue_title_upsert(self, media_type: str, tid: int, lang_tag: str, data: dict, season: tuple | None = None):
+        def op(con: sqlite3.Connection):
+            self._upsert_tmdb_base(con, media_type, tid, data)
+            if media_type == _TV:
+                self._upsert_tmdb_tv_seasons_episodes(con, tid, lang_tag, data, season=season)
+            with self.miss_lock:
+                self.miss_cache.pop((media_type, tid), None)
+
+        self._write_q.put(op)
+
     def _upsert_tmdb_title(self, media_type: str, tid: int, lang_tag: str, data: dict):
         if media_type not in ("movie", "tv"):
             return
         con = self._con()
-        try:
-            self._upsert_tmdb_base(con, media_type, tid, data)
-            self._upsert_tmdb_logos(con, media_type, tid, lang_tag)
-            self._upsert_tmdb_videos(con, media_type, tid, lang_tag)
-            self._upsert_tmdb_cast(con, media_type, tid)
-            self._upsert_tmdb_translations(con, media_type, tid)
-            if media_type == "tv":
-                self._upsert_tmdb_tv_seasons_episodes(con, tid, lang_tag, data)
-            con.commit()
-        finally:
-            con.close()
+        self._upsert_tmdb_base(con, media_type, tid, data)
+        self._upsert_tmdb_logos(con, media_type, tid, lang_tag)
+        self._upsert_tmdb_videos(con, media_type, tid, lang_tag)
+        self._upsert_tmdb_cast(con, media_type, tid)
+        self._upsert_tmdb_translations(con, media_type, tid)
+        if media_type == "tv":
+            self._upsert_tmdb_tv_seasons_episodes(con, tid, lang_tag, data)
+        con.commit()
 
     def _con(self):
-        con = sqlite3.connect(self.db_path, timeout=30)
-        con.row_factory = sqlite3.Row
-        con.execute("PRAGMA busy_timeout=30000")
+        con = getattr(self._tls_con, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db_path, timeout=30, cached_statements=256)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA busy_timeout=30000")
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA temp_store=MEMORY")
+            con.execute("PRAGMA cache_size=-65536")
+            con.execute("PRAGMA mmap_size=268435456")
+            self._tls_con.con = con
         return con
 
     def _translated(self, con: sqlite3.Connection, media_type: str, tid: int, iso639: str, iso3166: str | None):
@@ -656,90 +891,81 @@ class App:
             return (r["title"], r["overview"])
         return (None, None)
 
-    def _card_from_row(self, media_type: str, r: sqlite3.Row, iso639: str, iso3166: str | None, with_description: bool = False):
-        if media_type == "movie":
+    def _translated_batch(self, con: sqlite3.Connection, pairs: list[tuple[str, int]], iso639: str, iso3166: str | None):
+        if not self.has_translations or not pairs:
+            return {}
+        pairs = list(dict.fromkeys(pairs))
+        flat = tuple(x for p in pairs for x in p)
+        ph = ",".join("(?,?)" for _ in pairs)
+        out: dict[tuple[str, int], tuple] = {}
+        if iso3166:
+            rows = con.execute(
+                f"""
+                SELECT media_type, tmdb_id, title, overview
+                FROM title_translations
+                WHERE iso_639_1=? AND iso_3166_1=? AND (media_type, tmdb_id) IN (VALUES {ph})
+                """.strip(),
+                (iso639, iso3166, *flat),
+            ).fetchall()
+            for r in rows:
+                out[(r["media_type"], int(r["tmdb_id"]))] = (r["title"], r["overview"])
+        if len(out) < len(pairs):
+            rows = con.execute(
+                f"""
+                SELECT media_type, tmdb_id, title, overview
+                FROM title_translations
+                WHERE iso_639_1=? AND (media_type, tmdb_id) IN (VALUES {ph})
+                """.strip(),
+                (iso639, *flat),
+            ).fetchall()
+            for r in rows:
+                k = (r["media_type"], int(r["tmdb_id"]))
+                if k not in out:
+                    out[k] = (r["title"], r["overview"])
+        return out
+
+    def _cards_from_rows(self, con: sqlite3.Connection, media_type: str, rows, iso639: str, iso3166: str | None, with_description: bool = False):
+        rows = [dict(r) for r in rows]
+        tr = self._translated_batch(con, [(media_type, int(r["id"])) for r in rows], iso639, iso3166)
+        is_movie = media_type == _MOVIE
+        name_col = "title" if is_movie else "name"
+        date_col = "release_date" if is_movie else "first_air_date"
+        kind = _MOVIE if is_movie else _SERIES
+        out = []
+        for r in rows:
             tid = int(r["id"])
-            t_title, _t_over = self._translated(r["_con"], "movie", tid, iso639, iso3166) if "_con" in r.keys() else (None, None)
-            title = (t_title or r["title"] or "").strip()
+            t_title, t_over = tr.get((media_type, tid), (None, None))
+            title = (t_title or r.get(name_col) or "").strip()
             description = None
             if with_description:
-                s = (_t_over or r.get("overview") or "").strip()
+                s = (t_over or r.get("overview") or "").strip()
                 description = (s[:240] + "…") if len(s) > 240 else (s or None)
             poster = r.get("poster_path")
-            backdrop = r.get("backdrop_path")
-            logo = _pick_logo(r.get("logos_json"), iso639) or poster
-            return {
-                "id": tid,
-                "kind": "movie",
-                "name": title,
-                "description": description,
-                "year": _year(r.get("release_date")),
-                "rating": r.get("vote_average"),
-                "poster": poster,
-                "logo": logo,
-                "backdrop": backdrop,
-            }
-
-        tid = int(r["id"])
-        t_title, _t_over = self._translated(r["_con"], "tv", tid, iso639, iso3166) if "_con" in r.keys() else (None, None)
-        title = (t_title or r["name"] or "").strip()
-        description = None
-        if with_description:
-            s = (_t_over or r.get("overview") or "").strip()
-            description = (s[:240] + "…") if len(s) > 240 else (s or None)
-        poster = r.get("poster_path")
-        backdrop = r.get("backdrop_path")
-        logo = _pick_logo(r.get("logos_json"), iso639) or poster
-        return {
-            "id": tid,
-            "kind": "series",
-            "name": title,
-            "description": description,
-            "year": _year(r.get("first_air_date")),
-            "rating": r.get("vote_average"),
-            "poster": poster,
-            "logo": logo,
-            "backdrop": backdrop,
-        }
+            out.append(
+                {
+                    "id": tid,
+                    "kind": kind,
+                    "name": title,
+                    "description": description,
+                    "year": _year(r.get(date_col)),
+                    "rating": r.get("vote_average"),
+                    "poster": poster,
+                    "logo": _pick_logo(r.get("logos_json"), iso639) or poster,
+                    "backdrop": r.get("backdrop_path"),
+                }
+            )
+        return out
 
     def _tmdb_logo(self, media_type: str, tid: int, iso639: str):
         if not self.tmdb_key:
             return None
         k = (media_type, tid, iso639)
-        now = time.time()
+        now = time.monotonic()
         with self.logo_lock:
             cur = self.logo_cache.get(k)
-            if cur and (now - cur[0]) < self.logo_ttl_s:
+            if cur and cur[0] > now:
                 return cur[1]
 
-        def pick_best(data: dict):
-            best = None
-            best_ar = None
-            logos = data.get("logos") or []
-            if not isinstance(logos, list):
-                return None
-            for it in logos:
-                if not isinstance(it, dict):
-                    continue
-                fp = it.get("file_path")
-                if not fp:
-                    continue
-                loc = (it.get("iso_639_1") or "und").strip() or "und"
-                ar = it.get("aspect_ratio")
-                try:
-                    ar = float(ar) if ar is not None else None
-                except Exception:
-                    ar = None
-                score = 2
-                if loc == iso639:
-                    score = 0
-                elif loc == "en":
-                    score = 1
-                if best is None or score < best[0] or (score == best[0] and ar is not None and (best_ar is None or ar < best_ar)):
-                    best = (score, fp)
-                    best_ar = ar
-            return best[1] if best else None
-
         url = f"https://api.themoviedb.org/3/{media_type}/{tid}/images?api_key={self.tmdb_key}&include_image_language={iso639},en,null"
         url_all = f"https://api.themoviedb.org/3/{media_type}/{tid}/images?api_key={self.tmdb_key}"
         best = None
@@ -748,34 +974,72 @@ class App:
             if resp:
                 with resp:
                     if resp.status == 200:
-                        data = json.loads(resp.read().decode("utf-8"))
-                        best = pick_best(data)
+                        data = _loads(resp.read())
+                        best = _pick_best_logo(data, iso639)
             if best is None:
                 resp = self._tmdb_open(url_all, 8)
                 if resp:
                     with resp:
                         if resp.status == 200:
-                            data = json.loads(resp.read().decode("utf-8"))
-                            best = pick_best(data)
+                            data = _loads(resp.read())
+                            best = _pick_best_logo(data, iso639)
         except Exception:
             best = None
 
         val = best
         with self.logo_lock:
-            self.logo_cache[k] = (now, val)
+            self.logo_cache[k] = (time.monotonic() + self.logo_ttl_s, val)
         return val
 
+    def _logos_for(self, media_type: str, tid: int, logos_json: str | None):
+        k = (media_type, tid)
+        with self.logos_lock:
+            if k in self.logos_parsed:
+                return self.logos_parsed[k]
+        d = None
+        if logos_json:
+            try:
+                d = _orjson.loads(logos_json) if _orjson else json.loads(logos_json)
+            except Exception:
+                d = None
+        if not isinstance(d, dict):
+            d = None
+        with self.logos_lock:
+            if len(self.logos_parsed) > 20000:
+                self.logos_parsed.clear()
+            self.logos_parsed[k] = d
+        return d
+
+    def _note_miss(self, media_type: str, tid: int):
+        with self.miss_lock:
+            self.miss_cache[(media_type, tid)] = time.monotonic() + self.miss_ttl_s
+            if len(self.miss_cache) > 50000:
+                self.miss_cache.clear()
+
     def _enrich_card(self, con: sqlite3.Connection, card: dict, iso639: str, iso3166: str | None):
         tid = int(card.get("id") or 0)
         kind = card.get("kind")
-        if tid <= 0 or kind not in ("movie", "series"):
+        if tid <= 0 or kind not in (_MOVIE, _SERIES):
+            return card
+        media_type = _MOVIE if kind == _MOVIE else _TV
+        now = time.monotonic()
+        with self.miss_lock:
+            t0 = self.miss_cache.get((media_type, tid))
+            known_miss = bool(t0 and t0 > now)
+        if known_miss:
+            self._schedule_backfill(media_type, tid, iso639, iso3166, full=False)
+            if not card.get("logo"):
+                card["logo"] = card.get("poster")
+            if "backdrop" not in card:
+                card["backdrop"] = None
             return card
-        media_type = "movie" if kind == "movie" else "tv"
         if self._missing_parts(con, media_type, tid, iso639, iso3166, full=False):
             self._schedule_backfill(media_type, tid, iso639, iso3166, full=False)
 
         if kind == "movie":
             r = con.execute("SELECT title, overview, logos_json, backdrop_path FROM movies WHERE id=? LIMIT 1", (tid,)).fetchone()
+            if r is None:
+                self._note_miss(media_type, tid)
             if r:
                 r = dict(r)
                 t_title, t_over = self._translated(con, "movie", tid, iso639, iso3166)
@@ -785,11 +1049,13 @@ class App:
                 if not (card.get("description") or "").strip():
                     s = (t_over or r.get("overview") or "").strip()
                     card["description"] = (s[:240] + "…") if len(s) > 240 else (s or None)
-                card["logo"] = _pick_logo(r.get("logos_json"), iso639) or card.get("logo")
+                card["logo"] = _pick_logo_parsed(self._logos_for("movie", tid, r.get("logos_json")), iso639) or card.get("logo")
                 if not card.get("backdrop"):
                     card["backdrop"] = r.get("backdrop_path")
         else:
             r = con.execute("SELECT name, overview, logos_json, backdrop_path FROM series WHERE id=? LIMIT 1", (tid,)).fetchone()
+            if r is None:
+                self._note_miss(media_type, tid)
             if r:
                 r = dict(r)
                 t_title, t_over = self._translated(con, "tv", tid, iso639, iso3166)
@@ -799,7 +1065,7 @@ class App:
                 if not (card.get("description") or "").strip():
                     s = (t_over or r.get("overview") or "").strip()
                     card["description"] = (s[:240] + "…") if len(s) > 240 else (s or None)
-                card["logo"] = _pick_logo(r.get("logos_json"), iso639) or card.get("logo")
+                card["logo"] = _pick_logo_parsed(self._logos_for("tv", tid, r.get("logos_json")), iso639) or card.get("logo")
                 if not card.get("backdrop"):
                     card["backdrop"] = r.get("backdrop_path")
 
@@ -810,18 +1076,76 @@ class App:
             card["backdrop"] = None
         return card
 
+    def _enrich_cards(self, con: sqlite3.Connection, cards: list[dict], iso639: str, iso3166: str | None):
+        now = time.monotonic()
+        todo: dict[str, dict[int, list[dict]]] = {_MOVIE: {}, _TV: {}}
+        for card in cards:
+            tid = int(card.get("id") or 0)
+            kind = card.get("kind")
+            if tid <= 0 or kind not in (_MOVIE, _SERIES):
+                continue
+            media_type = _MOVIE if kind == _MOVIE else _TV
+            with self.miss_lock:
+                t0 = self.miss_cache.get((media_type, tid))
+            if t0 and t0 > now:
+                self._schedule_backfill(media_type, tid, iso639, iso3166, full=False)
+                continue
+            todo[media_type].setdefault(tid, []).append(card)
+
+        rows: dict[tuple[str, int], dict] = {}
+        for media_type, tbl, name_col in ((_MOVIE, "movies", "title"), (_TV, "series", "name")):
+            ids = list(todo[media_type])
+            if not ids:
+                continue
+            ph = ",".join("?" for _ in ids)
+            for r in con.execute(
+                f"SELECT id, {name_col} AS base_name, overview, logos_json, backdrop_path FROM {tbl} WHERE id IN ({ph})",
+                ids,
+            ):
+                rows[(media_type, int(r["id"]))] = dict(r)
+        tr = self._translated_batch(con, list(rows.keys()), iso639, iso3166)
+
+        for media_type in (_MOVIE, _TV):
+            for tid, for_title in todo[media_type].items():
+                r = rows.get((media_type, tid))
+                if r is None:
+                    self._note_miss(media_type, tid)
+                    self._schedule_backfill(media_type, tid, iso639, iso3166, full=False)
+                    continue
+                t_title, t_over = tr.get((media_type, tid), (None, None))
+                if not r.get("logos_json") or (self.has_translations and (media_type, tid) not in tr):
+                    self._schedule_backfill(media_type, tid, iso639, iso3166, full=False)
+                logo = _pick_logo_parsed(self._logos_for(media_type, tid, r.get("logos_json")), iso639)
+                nm = (t_title or r.get("base_name") or "").strip()
+                for card in for_title:
+                    if nm:
+                        card["name"] = nm
+                    if not (card.get("description") or "").strip():
+                        s = (t_over or r.get("overview") or "").strip()
+                        card["description"] = (s[:240] + "…") if len(s) > 240 else (s or None)
+                    card["logo"] = logo or card.get("logo")
+                    if not card.get("backdrop"):
+                        card["backdrop"] = r.get("backdrop_path")
+
+        for card in cards:
+            if not card.get("logo"):
+                card["logo"] = card.get("poster")
+            if "backdrop" not in card:
+                card["backdrop"] = None
+        return cards
+
     def _tmdb_similar(self, kind: str, tid: int, iso639: str, iso3166: str | None):
         if not self.tmdb_key:
             return []
         lang_tag = _lang_tag(iso639, iso3166)
         k = (kind, tid, lang_tag)
-        now = time.time()
+        now = time.monotonic()
         with self.similar_lock:
             cur = self.similar_cache.get(k)
-            if cur and (now - cur[0]) < self.similar_ttl_s:
+            if cur and cur[0] > now:
                 return cur[1]
 
-        media_type = "movie" if kind == "movie" else "tv"
+        media_type = _MOVIE if kind == _MOVIE else _TV
         url = f"https://api.themoviedb.org/3/{media_type}/{tid}/similar?api_key={self.tmdb_key}&language={iso639}"
         out = []
         try:
@@ -830,39 +1154,33 @@ class App:
                 return []
             with resp:
                 if resp.status == 200:
-                    data = json.loads(resp.read().decode("utf-8"))
+                    data = _loads(resp.read())
                     res = data.get("results") or []
                     if isinstance(res, list):
-                        for it in res[:24]:
-                            if not isinstance(it, dict):
-                                continue
-                            i = int(it.get("id") or 0)
-                            if i <= 0:
-                                continue
-                            out.append(
-                                {
-                                    "id": i,
-                                    "kind": "movie" if media_type == "movie" else "series",
-                                    "name": (it.get("title") or it.get("name") or "").strip(),
-                                    "year": _year(it.get("release_date") or it.get("first_air_date")),
-                                    "rating": it.get("vote_average"),
-                                    "poster": it.get("poster_path"),
-                                    "logo": it.get("poster_path"),
-                                    "backdrop": it.get("backdrop_path"),
-                                }
-                            )
+                        out_kind = _MOVIE if media_type == _MOVIE else _SERIES
+                        out = [
+                            {
+                                "id": i,
+                                "kind": out_kind,
+                                "name": (it.get("title") or it.get("name") or "").strip(),
+                                "year": _year(it.get("release_date") or it.get("first_air_date")),
+                                "rating": it.get("vote_average"),
+                                "poster": it.get("poster_path"),
+                                "logo": it.get("poster_path"),
+                                "backdrop": it.get("backdrop_path"),
+                            }
+                            for it in res[:24]
+                            if isinstance(it, dict) and (i := int(it.get("id") or 0)) > 0
+                        ]
         except Exception:
             out = []
 
         if out:
             con = self._con()
-            try:
-                out = [self._enrich_card(con, c, iso639, iso3166) for c in out]
-            finally:
-                con.close()
+            out = [self._enrich_card(con, c, iso639, iso3166) for c in out]
 
         with self.similar_lock:
-            self.similar_cache[k] = (now, out)
+            self.similar_cache[k] = (time.monotonic() + self.similar_ttl_s, out)
         return out
 
     def _tmdb_trending(self, window: str, lang: str):
@@ -871,10 +1189,10 @@ class App:
         if window not in ("day", "week"):
             return []
         k = (window, lang)
-        now = time.time()
+        now = time.monotonic()
         with self.trending_lock:
             cur = self.trending_cache.get(k)
-            if cur and (now - cur[0]) < self.trending_ttl_s:
+            if cur and cur[0] > now:
                 return cur[1]
 
         url = f"https://api.themoviedb.org/3/trending/all/{window}?api_key={self.tmdb_key}&language={lang}"
@@ -885,7 +1203,7 @@ class App:
                 return []
             with resp:
                 if resp.status == 200:
-                    data = json.loads(resp.read().decode("utf-8"))
+                    data = _loads(resp.read())
                     res = data.get("results") or []
                     if isinstance(res, list):
                         out = [it for it in res if isinstance(it, dict)]
@@ -893,5 +1211,5 @@ class App:
             out = []
 
         with self.trending_lock:
-            self.trending_cache[k] = (now, out)
+            self.trending_cache[k] = (time.monotonic() + self.trending_ttl_s, out)
         return out
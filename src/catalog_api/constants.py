@@ -1,3 +1,6 @@
+import sys
+from types import MappingProxyType
+
 PROVIDERS = ["Netflix", "Prime", "Max", "Disney+", "AppleTV", "Paramount"]
 
 PROVIDER_NEEDLES = {
@@ -19,7 +22,7 @@ HOME_GENRES = {
     "Animation": ("Animation",),
 }
 
-BROWSE_TABS = {
+_RAW_BROWSE_TABS = {
     "popular": ("popular", None),
     "rating": ("rating", None),
     "recent": ("recent", None),
@@ -43,3 +46,5 @@ BROWSE_TABS = {
     "war": ("genre", "War"),
     "western": ("genre", "Western"),
 }
+
+BROWSE_TABS = MappingProxyType({sys.intern(k): v for k, v in _RAW_BROWSE_TABS.items()})
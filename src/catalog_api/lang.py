@@ -26,5 +26,12 @@ def _pick_lang(qs: dict, accept_language: str | None) -> tuple[str, str | None]:
     return _accept_lang(accept_language)
 
 
+def _pick_lang_value(v: str | None, accept_language: str | None) -> tuple[str, str | None]:
+    v = (v or "").strip()
+    if v:
+        return _split_lang(v)
+    return _accept_lang(accept_language)
+
+
 def _lang_tag(iso639: str, iso3166: str | None):
     return f"{iso639}-{iso3166}" if iso3166 else iso639
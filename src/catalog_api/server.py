@@ -1,3 +1,4 @@
+import base64
 import json
 import gzip
 import os
@@ -6,25 +7,42 @@ import socket
 import sqlite3
 import ssl
 import time
+from functools import lru_cache
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from threading import Lock, Thread
-from urllib.parse import parse_qs, unquote, urlparse
+from urllib.parse import unquote, urlparse
 
 from .app import App
 from .constants import BROWSE_TABS, HOME_GENRES, PROVIDERS, PROVIDER_NEEDLES
-from .lang import _lang_tag, _pick_lang
-from .util import _pick_logo, _year
+from .lang import _lang_tag, _pick_lang_value, _split_lang
+from .util import _json_loads_best_effort, _pick_logo, _year
 
 try:
     import brotli as _brotli
 except Exception:
     _brotli = None
 
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
+try:
+    import deflate as _deflate
+except Exception:
+    _deflate = None
 
-def _br_compress(raw: bytes) -> bytes | None:
+
+def _dumps(obj) -> bytes:
+    if _orjson:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _br_compress(raw: bytes, quality: int | None = None) -> bytes | None:
     if not _brotli:
         return None
-    q = int(os.environ.get("BROTLI_QUALITY") or "5")
+    q = quality if quality is not None else int(os.environ.get("BROTLI_QUALITY") or "11")
     q = 0 if q < 0 else (11 if q > 11 else q)
     try:
         return _brotli.compress(raw, quality=q)
@@ -32,10 +50,206 @@ def _br_compress(raw: bytes) -> bytes | None:
         return None
 
 
+@lru_cache(maxsize=4096)
+def _clen(n: int) -> str:
+    return str(n)
+
+
+@lru_cache(maxsize=1024)
+def _cors_allow(origin: str) -> str | None:
+    u = urlparse(origin)
+    if u.scheme not in ("http", "https") or not u.netloc:
+        return None
+    host = (u.hostname or "").strip().lower()
+    if not host:
+        return None
+    allow_local = (os.environ.get("CORS_ALLOW_LOCALHOST") or "").strip().lower() in ("1", "true", "yes")
+    if allow_local and host in ("localhost", "127.0.0.1", "::1"):
+        return origin
+    raw = os.environ.get("CORS_ALLOW_HOSTS") or ""
+    allow = {h.strip().lower() for h in raw.replace(" ", ",").split(",") if h.strip()}
+    if host in allow and u.scheme == "https":
+        return origin
+    return None
+
+
+def _query_param(query: str, key: str) -> str:
+    if not query:
+        return ""
+    needle = key + "="
+    for part in query.split("&"):
+        if part.startswith(needle):
+            return unquote(part[len(needle):])
+    return ""
+
+
+def _gz_compress(raw: bytes) -> bytes:
+    if _deflate:
+        try:
+            return _deflate.gzip_compress(raw, 6)
+        except Exception:
+            pass
+    return gzip.compress(raw, compresslevel=5)
+
+
+_SQL_MOVIES_BY_POP_10 = "SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 10"
+_SQL_SERIES_BY_POP_10 = "SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 10"
+_SQL_MOVIES_BY_POP_30 = "SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 30"
+_SQL_SERIES_BY_POP_30 = "SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 30"
+_SQL_TOP_RATED_MOVIES = """
+SELECT * FROM (
+  SELECT * FROM movies ORDER BY COALESCE(vote_average,0) DESC LIMIT 48
+) ORDER BY COALESCE(vote_count,0) DESC LIMIT 12
+""".strip()
+_SQL_TOP_RATED_SERIES = """
+SELECT * FROM (
+  SELECT * FROM series ORDER BY COALESCE(vote_average,0) DESC LIMIT 48
+) ORDER BY COALESCE(vote_count,0) DESC LIMIT 12
+""".strip()
+
+
+def _encode_cursor(pop, tid: int) -> str:
+    raw = _dumps({"pop": pop, "id": tid})
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str | None):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        d = json.loads(raw)
+        return (float(d.get("pop") or 0.0), int(d.get("id") or 0))
+    except Exception:
+        return None
+
+
+def _tr_title_expr(media_type: str, id_expr: str) -> str:
+    return (
+        "(SELECT tt.title FROM title_translations tt "
+        f"WHERE tt.media_type='{media_type}' AND tt.tmdb_id={id_expr} AND tt.iso_639_1=? "
+        "ORDER BY (tt.iso_3166_1=?) DESC LIMIT 1)"
+    )
+
+
+@lru_cache(maxsize=32)
+def _genre_join_sql(n_names: int, with_tr: bool, with_ks: bool, with_rank: bool = False) -> str:
+    ph = ",".join("?" for _ in range(n_names))
+    if with_tr:
+        name_m = f"COALESCE({_tr_title_expr('movie', 'm.id')},m.title)"
+        name_s = f"COALESCE({_tr_title_expr('tv', 's.id')},s.name)"
+    else:
+        name_m = "m.title"
+        name_s = "s.name"
+    pred_m = "AND (COALESCE(m.popularity,0) < ? OR (COALESCE(m.popularity,0) = ? AND m.id < ?))" if with_ks else ""
+    pred_s = "AND (COALESCE(s.popularity,0) < ? OR (COALESCE(s.popularity,0) = ? AND s.id < ?))" if with_ks else ""
+    if with_rank:
+        rnk_m = ",COALESCE(m.pop_rank,1000000000) rnk"
+        rnk_s = ",COALESCE(s.pop_rank,1000000000) rnk"
+        order = "rnk ASC, id DESC"
+    else:
+        rnk_m = ""
+        rnk_s = ""
+        order = "COALESCE(pop,0) DESC, id DESC"
+    return f"""
+SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos,gen FROM (
+  SELECT DISTINCT m.id id,'movie' kind,{name_m} name,m.release_date dt,m.vote_average rating,m.popularity pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos,'' gen{rnk_m}
+  FROM movies m
+  JOIN title_genres tg ON tg.media_type='movie' AND tg.tmdb_id=m.id
+  JOIN genres g ON g.media_type='movie' AND g.genre_id=tg.genre_id
+  WHERE g.name IN ({ph}) {pred_m}
+  UNION ALL
+  SELECT DISTINCT s.id id,'series' kind,{name_s} name,s.first_air_date dt,s.vote_average rating,s.popularity pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos,'' gen{rnk_s}
+  FROM series s
+  JOIN title_genres tg ON tg.media_type='tv' AND tg.tmdb_id=s.id
+  JOIN genres g ON g.media_type='tv' AND g.genre_id=tg.genre_id
+  WHERE g.name IN ({ph}) {pred_s}
+)
+ORDER BY {order}
+LIMIT ? OFFSET ?
+""".strip()
+
+
+@lru_cache(maxsize=64)
+def _union_sql_text(where_movies: str, where_series: str, order_by: str, order_movies: str, order_series: str, mv_gen: str, tv_gen: str, name_m: str, name_s: str) -> str:
+    return f"""
+SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos,gen FROM (
+  SELECT * FROM (
+    SELECT id,'movie' kind,{name_m} name,release_date dt,vote_average rating,popularity pop,poster_path poster,backdrop_path backdrop,logos_json logos,{mv_gen} gen
+    FROM movies
+    {where_movies}
+    ORDER BY {order_movies}
+    LIMIT ?
+  )
+  UNION ALL
+  SELECT * FROM (
+    SELECT id,'series' kind,{name_s} name,first_air_date dt,vote_average rating,popularity pop,poster_path poster,backdrop_path backdrop,logos_json logos,{tv_gen} gen
+    FROM series
+    {where_series}
+    ORDER BY {order_series}
+    LIMIT ?
+  )
+)
+ORDER BY {order_by}
+LIMIT ? OFFSET ?
+""".strip()
+
+
+@lru_cache(maxsize=32)
+def _series_on_sql(n_needles: int) -> str:
+    where = " OR ".join("COALESCE(networks,'') LIKE ?" for _ in range(n_needles))
+    return f"SELECT * FROM series WHERE {where} ORDER BY COALESCE(popularity,0) DESC LIMIT 18"
+
+
+_SQL_MOVIE_BY_ID = "SELECT * FROM movies WHERE id=? LIMIT 1"
+_SQL_SERIES_BY_ID = "SELECT * FROM series WHERE id=? LIMIT 1"
+_ITEM_KEYS = ("id", "kind", "name", "year", "rating", "poster", "logo", "backdrop")
+
+_SQL_PREFETCH_EPISODES = """
+WITH pick(sn) AS (
+  SELECT COALESCE(
+    (SELECT MIN(season_number) FROM tv_seasons WHERE series_id=? AND season_number>0),
+    (SELECT MIN(season_number) FROM tv_episodes WHERE series_id=? AND season_number>0))
+)
+SELECT pick.sn, e.episode_number, e.name, e.runtime, e.still_path
+FROM pick LEFT JOIN tv_episodes e ON e.series_id=? AND e.season_number=pick.sn
+ORDER BY e.episode_number ASC
+""".strip()
+_SQL_PREFETCH_EPISODES_NO_SEASONS = """
+WITH pick(sn) AS (
+  SELECT (SELECT MIN(season_number) FROM tv_episodes WHERE series_id=? AND season_number>0)
+)
+SELECT pick.sn, e.episode_number, e.name, e.runtime, e.still_path
+FROM pick LEFT JOIN tv_episodes e ON e.series_id=? AND e.season_number=pick.sn
+ORDER BY e.episode_number ASC
+""".strip()
+
+
+_SEC_HDR_BYTES = (
+    b"X-Content-Type-Options: nosniff\r\n"
+    b"Referrer-Policy: no-referrer\r\n"
+    b"Permissions-Policy: geolocation=(), microphone=(), camera=()\r\n"
+    b"X-Frame-Options: DENY\r\n"
+    b"Content-Security-Policy: default-src 'none'; frame-ancestors 'none'; base-uri 'none'; form-action 'none'\r\n"
+)
+_HSTS_HDR_BYTES = b"Strict-Transport-Security: max-age=31536000; includeSubDomains\r\n"
+
+
+def _pick_encoding(raw: bytes, gz: bytes, br: bytes | None, accept_encoding: str | None):
+    ae = (accept_encoding or "").lower()
+    if "br" in ae and br:
+        return (br, "br")
+    if "gzip" in ae:
+        return (gz, "gzip")
+    return (raw, None)
+
+
 class H(BaseHTTPRequestHandler):
     protocol_version = "HTTP/1.1"
-    _rl_lock = Lock()
-    _rl: dict[str, tuple[float, float]] = {}
+    _rl_shards: tuple[tuple[Lock, dict[str, tuple[float, float]]], ...] = tuple((Lock(), {}) for _ in range(16))
+    _rl_shard_cap = 20000 // 16
+    _gz_lock = Lock()
+    _gz_cache: dict[bytes, bytes] = {}
 
     def log_message(self, *_args):
         return
@@ -46,25 +260,16 @@ class H(BaseHTTPRequestHandler):
             self.connection.settimeout(float(os.environ.get("CONN_TIMEOUT_S") or "15"))
         except Exception:
             pass
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
 
     def _cors_origin(self) -> str | None:
         origin = (self.headers.get("Origin") or "").strip()
         if not origin:
             return None
-        u = urlparse(origin)
-        if u.scheme not in ("http", "https") or not u.netloc:
-            return None
-        host = (u.hostname or "").strip().lower()
-        if not host:
-            return None
-        allow_local = (os.environ.get("CORS_ALLOW_LOCALHOST") or "").strip().lower() in ("1", "true", "yes")
-        if allow_local and host in ("localhost", "127.0.0.1", "::1"):
-            return origin
-        raw = os.environ.get("CORS_ALLOW_HOSTS") or ""
-        allow = {h.strip().lower() for h in raw.replace(" ", ",").split(",") if h.strip()}
-        if host in allow and u.scheme == "https":
-            return origin
-        return None
+        return _cors_allow(origin)
 
     def _cors_send(self):
         origin = self._cors_origin()
@@ -74,13 +279,12 @@ class H(BaseHTTPRequestHandler):
         self.send_header("Vary", "Origin")
 
     def _sec_send(self):
-        self.send_header("X-Content-Type-Options", "nosniff")
-        self.send_header("Referrer-Policy", "no-referrer")
-        self.send_header("Permissions-Policy", "geolocation=(), microphone=(), camera=()")
-        self.send_header("X-Frame-Options", "DENY")
-        self.send_header("Content-Security-Policy", "default-src 'none'; frame-ancestors 'none'; base-uri 'none'; form-action 'none'")
+        buf = getattr(self, "_headers_buffer", None)
+        if buf is None:
+            buf = self._headers_buffer = []
+        buf.append(_SEC_HDR_BYTES)
         if getattr(self.server, "is_tls", False):
-            self.send_header("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
+            buf.append(_HSTS_HDR_BYTES)
 
     def _client_ip(self) -> str:
         ip = (self.headers.get("CF-Connecting-IP") or "").strip()
@@ -99,77 +303,71 @@ class H(BaseHTTPRequestHandler):
         if rps <= 0 or burst <= 0:
             return True
         ip = self._client_ip()
+        lock, rl = self._rl_shards[hash(ip) & 15]
         now = time.monotonic()
-        with self._rl_lock:
-            tokens, last = self._rl.get(ip, (burst, now))
+        with lock:
+            tokens, last = rl.get(ip, (burst, now))
             tokens = min(burst, tokens + (now - last) * rps)
-            if tokens < 1.0:
-                self._rl[ip] = (tokens, now)
-                if len(self._rl) > 20000:
-                    self._rl.clear()
-                return False
-            self._rl[ip] = (tokens - 1.0, now)
-            if len(self._rl) > 20000:
-                self._rl.clear()
-            return True
-
-    def _send(self, code: int, body: bytes, content_type: str = "text/plain; charset=utf-8"):
-        self.send_response(code)
-        self._cors_send()
-        self._sec_send()
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Connection", "close")
-        self.end_headers()
-        self.wfile.write(body)
+            allowed = tokens >= 1.0
+            rl[ip] = (tokens - 1.0, now) if allowed else (tokens, now)
+            while len(rl) > self._rl_shard_cap:
+                del rl[next(iter(rl))]
+            return allowed
+
+    def _write_response(self, body: bytes):
+        buf = getattr(self, "_headers_buffer", None)
+        if buf:
+            buf.append(b"\r\n")
+            hdrs = b"".join(buf)
+            self._headers_buffer = []
+        else:
+            hdrs = b""
+        if len(body) > 16384:
+            if hdrs:
+                self.wfile.write(hdrs)
+            self.wfile.write(memoryview(body))
+        else:
+            self.wfile.write(hdrs + body)
         try:
             self.wfile.flush()
         except Exception:
             pass
-        self.close_connection = True
+
+    def _emit(self, code: int, body: bytes, content_type: str, encoding: str | None = None):
+        self.send_response(code)
+        self._cors_send()
+        self._sec_send()
+        send = self.send_header
+        send("Content-Type", content_type)
+        if encoding:
+            send("Content-Encoding", encoding)
+            send("Vary", "Accept-Encoding")
+        send("Content-Length", _clen(len(body)))
+        self._write_response(body)
+
+    def _send(self, code: int, body: bytes, content_type: str = "text/plain; charset=utf-8"):
+        self._emit(code, body, content_type)
 
     def _send_json(self, code: int, obj):
-        raw = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        raw = _dumps(obj)
         ae = (self.headers.get("Accept-Encoding") or "").lower()
         force_gzip = (os.environ.get("FORCE_GZIP") or "").strip().lower() in ("1", "true", "yes")
         via_proxy = bool((self.headers.get("CF-Connecting-IP") or "").strip() or (self.headers.get("X-Forwarded-For") or "").strip())
         if force_gzip or via_proxy or "gzip" in ae:
-            body = gzip.compress(raw, compresslevel=5)
-            self.send_response(code)
-            self._cors_send()
-            self._sec_send()
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Content-Encoding", "gzip")
-            self.send_header("Vary", "Accept-Encoding")
-            self.send_header("Content-Length", str(len(body)))
-            self.send_header("Connection", "close")
-            self.end_headers()
-            self.wfile.write(body)
-            try:
-                self.wfile.flush()
-            except Exception:
-                pass
-            self.close_connection = True
+            with self._gz_lock:
+                body = self._gz_cache.get(raw)
+            if body is None:
+                body = _gz_compress(raw)
+                with self._gz_lock:
+                    while len(self._gz_cache) > 256:
+                        del self._gz_cache[next(iter(self._gz_cache))]
+                    self._gz_cache[raw] = body
+            self._emit(code, body, "application/json; charset=utf-8", "gzip")
             return
-        self._send(code, raw, "application/json; charset=utf-8")
+        self._emit(code, raw, "application/json; charset=utf-8")
 
     def _send_json_bytes(self, code: int, body: bytes, encoding: str | None):
-        self.send_response(code)
-        self._cors_send()
-        self._sec_send()
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        if encoding:
-            self.send_header("Content-Encoding", encoding)
-            self.send_header("Vary", "Accept-Encoding")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Connection", "close")
-        self.end_headers()
-        self.wfile.write(body)
-        try:
-            self.wfile.flush()
-        except Exception:
-            pass
-        self.close_connection = True
+        self._emit(code, body, "application/json; charset=utf-8", encoding)
 
     def do_OPTIONS(self):
         if not self._rate_allow():
@@ -194,31 +392,28 @@ class H(BaseHTTPRequestHandler):
             self.send_header("Access-Control-Max-Age", "600")
             self._sec_send()
             self.send_header("Content-Length", "0")
-            self.send_header("Connection", "close")
             self.end_headers()
-            self.close_connection = True
             return
         self.send_response(204)
         self._sec_send()
         self.send_header("Content-Length", "0")
-        self.send_header("Connection", "close")
         self.end_headers()
-        self.close_connection = True
 
     def do_GET(self):
         if not self._rate_allow():
             self._send(429, b"rate limited\n")
+            self.close_connection = True
             return
         wt_raw = (os.environ.get("WRITE_TIMEOUT_S") or "").strip()
-        try:
-            self.connection.settimeout(float(wt_raw) if wt_raw else None)
-        except Exception:
-            pass
-        u = urlparse(self.path)
-        path = u.path
-        qs = parse_qs(u.query or "")
-        iso639, iso3166 = _pick_lang(qs, self.headers.get("Accept-Language"))
-        if (path == "/v1/search" or path.startswith("/v1/search/")) and not (qs.get("lang") or [""])[0].strip():
+        if wt_raw:
+            try:
+                self.connection.settimeout(float(wt_raw))
+            except Exception:
+                pass
+        path, _, query = self.path.partition("?")
+        lang_q = _query_param(query, "lang")
+        iso639, iso3166 = _pick_lang_value(lang_q, self.headers.get("Accept-Language"))
+        if (path == "/v1/search" or path.startswith("/v1/search/")) and not lang_q.strip():
             iso639, iso3166 = ("en", None)
 
         if path in ("/ping", "/health"):
@@ -256,15 +451,18 @@ class H(BaseHTTPRequestHandler):
             except Exception:
                 self._send(404, b"not found\n")
                 return
-            out = self.server.app_browse(tab, page, iso639, iso3166)
+            cursor = _query_param(query, "cursor") or None
+            out = self.server.app_browse_bytes(tab, page, iso639, iso3166, self.headers.get("Accept-Encoding"), cursor)
             if out is None:
                 self._send(404, b"not found\n")
                 return
-            self._send_json(200, out)
+            body, enc = out
+            self._send_json_bytes(200, body, enc)
             return
 
         if path == "/v1/search":
-            self._send_json(200, self.server.app_search_page(iso639, iso3166))
+            body, enc = self.server.app_search_page_bytes(iso639, iso3166, self.headers.get("Accept-Encoding"))
+            self._send_json_bytes(200, body, enc)
             return
 
         if path.startswith("/v1/search/"):
@@ -296,6 +494,47 @@ class APIServer(ThreadingHTTPServer):
     def __init__(self, server_address, RequestHandlerClass, app: App):
         super().__init__(server_address, RequestHandlerClass)
         self.app = app
+        Thread(target=self._home_refresher, daemon=True).start()
+
+    def _home_refresher(self):
+        while True:
+            time.sleep(max(60.0, self.app.home_ttl_s / 2))
+            try:
+                with self.app.home_lock:
+                    tags = list(self.app.home_cache.keys())
+                now = time.time()
+                for tag in tags:
+                    with self.app.home_lock:
+                        cur = self.app.home_cache.get(tag)
+                    if cur and (now - cur[0]) < self.app.home_ttl_s / 2:
+                        continue
+                    iso639, iso3166 = _split_lang(tag)
+                    self.app_home(iso639, iso3166, force=True)
+            except Exception:
+                pass
+
+    def _queue_brotli(self, cache: dict, lock, key, raw: bytes):
+        if not _brotli:
+            return
+
+        def run():
+            br = _br_compress(raw)
+            if not br:
+                return
+            with lock:
+                cur = cache.get(key)
+                if cur and cur[-3] is raw:
+                    cache[key] = cur[:-1] + (br,)
+
+        self.app.compress_ex.submit(run)
+
+    def _refresh_home(self, lang_tag: str):
+        try:
+            iso639, iso3166 = _split_lang(lang_tag)
+            self.app_home(iso639, iso3166, force=True)
+        finally:
+            with self.app.home_lock:
+                self.app.home_refresh_inflight.discard(lang_tag)
 
     def _genre_needles(self, s: str):
         s = (s or "").strip()
@@ -305,514 +544,493 @@ class APIServer(ThreadingHTTPServer):
             return ("Science Fiction", "Sci-Fi & Fantasy", "Sci-Fi")
         return (s,)
 
-    def app_home(self, iso639: str, iso3166: str | None):
+    def app_home(self, iso639: str, iso3166: str | None, force: bool = False):
         lang_tag = _lang_tag(iso639, iso3166)
         now = time.time()
-        with self.app.home_lock:
-            cur = self.app.home_cache.get(lang_tag)
-            if cur and (now - cur[0]) < self.app.home_ttl_s:
-                return cur[1]
+        if not force:
+            with self.app.home_lock:
+                cur = self.app.home_cache.get(lang_tag)
+                if cur and (now - cur[0]) < self.app.home_ttl_s:
+                    return cur[1]
 
         con = self.app._con()
-        try:
-            con.row_factory = sqlite3.Row
-
-            def movie_cards(sql: str, params=()):
-                rows = con.execute(sql, params).fetchall()
-                out = []
-                for r in rows:
-                    rr = dict(r)
-                    rr["_con"] = con
-                    out.append(self.app._card_from_row("movie", rr, iso639, iso3166, with_description=False))
-                return out
-
-            def series_cards(sql: str, params=()):
-                rows = con.execute(sql, params).fetchall()
-                out = []
-                for r in rows:
-                    rr = dict(r)
-                    rr["_con"] = con
-                    out.append(self.app._card_from_row("tv", rr, iso639, iso3166, with_description=False))
-                return out
-
-            def movie_cards_with_desc(sql: str, params=()):
-                rows = con.execute(sql, params).fetchall()
-                out = []
-                for r in rows:
-                    rr = dict(r)
-                    rr["_con"] = con
-                    out.append(self.app._card_from_row("movie", rr, iso639, iso3166, with_description=True))
-                return out
-
-            def series_cards_with_desc(sql: str, params=()):
-                rows = con.execute(sql, params).fetchall()
-                out = []
-                for r in rows:
-                    rr = dict(r)
-                    rr["_con"] = con
-                    out.append(self.app._card_from_row("tv", rr, iso639, iso3166, with_description=True))
-                return out
-
-            def tmdb_card(it: dict):
-                mt = (it.get("media_type") or "").strip().lower()
-                if mt == "movie":
-                    tid = int(it.get("id") or 0)
-                    d = (it.get("overview") or "").strip()
-                    return {
-                        "id": tid,
-                        "kind": "movie",
-                        "name": (it.get("title") or "").strip(),
-                        "description": (d[:240] + "…") if len(d) > 240 else (d or None),
-                        "year": _year(it.get("release_date")),
-                        "rating": it.get("vote_average"),
-                        "poster": it.get("poster_path"),
-                        "logo": it.get("poster_path"),
-                        "backdrop": it.get("backdrop_path"),
-                    }
-                if mt == "tv":
-                    tid = int(it.get("id") or 0)
-                    d = (it.get("overview") or "").strip()
-                    return {
-                        "id": tid,
-                        "kind": "series",
-                        "name": (it.get("name") or "").strip(),
-                        "description": (d[:240] + "…") if len(d) > 240 else (d or None),
-                        "year": _year(it.get("first_air_date")),
-                        "rating": it.get("vote_average"),
-                        "poster": it.get("poster_path"),
-                        "logo": it.get("poster_path"),
-                        "backdrop": it.get("backdrop_path"),
-                    }
-                return None
+        con.row_factory = sqlite3.Row
+
+        def movie_cards(sql: str, params=()):
+            return self.app._cards_from_rows(con, "movie", con.execute(sql, params).fetchall(), iso639, iso3166)
+
+        def series_cards(sql: str, params=()):
+            return self.app._cards_from_rows(con, "tv", con.execute(sql, params).fetchall(), iso639, iso3166)
+
+        def movie_cards_with_desc(sql: str, params=()):
+            return self.app._cards_from_rows(con, "movie", con.execute(sql, params).fetchall(), iso639, iso3166, with_description=True)
+
+        def series_cards_with_desc(sql: str, params=()):
+            return self.app._cards_from_rows(con, "tv", con.execute(sql, params).fetchall(), iso639, iso3166, with_description=True)
+
+        def tmdb_card(it: dict):
+            mt = (it.get("media_type") or "").strip().lower()
+            if mt == "movie":
+                tid = int(it.get("id") or 0)
+                d = (it.get("overview") or "").strip()
+                return {
+                    "id": tid,
+                    "kind": "movie",
+                    "name": (it.get("title") or "").strip(),
+                    "description": (d[:240] + "…") if len(d) > 240 else (d or None),
+                    "year": _year(it.get("release_date")),
+                    "rating": it.get("vote_average"),
+                    "poster": it.get("poster_path"),
+                    "logo": it.get("poster_path"),
+                    "backdrop": it.get("backdrop_path"),
+                }
+            if mt == "tv":
+                tid = int(it.get("id") or 0)
+                d = (it.get("overview") or "").strip()
+                return {
+                    "id": tid,
+                    "kind": "series",
+                    "name": (it.get("name") or "").strip(),
+                    "description": (d[:240] + "…") if len(d) > 240 else (d or None),
+                    "year": _year(it.get("first_air_date")),
+                    "rating": it.get("vote_average"),
+                    "poster": it.get("poster_path"),
+                    "logo": it.get("poster_path"),
+                    "backdrop": it.get("backdrop_path"),
+                }
+            return None
 
-            slider = []
-            top10_today = []
-            trending_today = []
-            if self.app.tmdb_key:
-                day = []
-                for it in self.app._tmdb_trending("day", lang_tag):
-                    mt = (it.get("media_type") or "").lower()
-                    if mt not in ("movie", "tv"):
-                        continue
-                    try:
-                        if int(it.get("id") or 0) <= 0:
-                            continue
-                    except Exception:
-                        continue
-                    day.append(it)
-                if day:
-                    slider_picks = random.sample(day, k=min(10, len(day)))
-                    for it in slider_picks:
-                        c = tmdb_card(it)
-                        if c:
-                            slider.append(self.app._enrich_card(con, c, iso639, iso3166))
-
-                    picks = random.sample(day, k=min(10, len(day)))
-                    for it in picks:
-                        c = tmdb_card(it)
-                        if c:
-                            top10_today.append(self.app._enrich_card(con, c, iso639, iso3166))
-
-                week = []
-                for it in self.app._tmdb_trending("week", lang_tag):
-                    mt = (it.get("media_type") or "").lower()
-                    if mt not in ("movie", "tv"):
+        slider = []
+        top10_today = []
+        trending_today = []
+        if self.app.tmdb_key:
+            f_day = self.app.tmdb_ex.submit(self.app._tmdb_trending, "day", lang_tag)
+            f_week = self.app.tmdb_ex.submit(self.app._tmdb_trending, "week", lang_tag)
+            day = []
+            for it in f_day.result():
+                mt = (it.get("media_type") or "").lower()
+                if mt not in ("movie", "tv"):
+                    continue
+                try:
+                    if int(it.get("id") or 0) <= 0:
                         continue
-                    try:
-                        if int(it.get("id") or 0) <= 0:
-                            continue
-                    except Exception:
+                except Exception:
+                    continue
+                day.append(it)
+            if day:
+                picks = random.sample(day, k=min(20, len(day)))
+                cards = [c for c in (tmdb_card(it) for it in picks) if c]
+                cards = self.app._enrich_cards(con, cards, iso639, iso3166)
+                # pools under 20 let the two rails overlap so top10 still gets
+                # its full 10 cards
+                slider = cards[:10]
+                top10_today = cards[-10:]
+
+            week = []
+            for it in f_week.result():
+                mt = (it.get("media_type") or "").lower()
+                if mt not in ("movie", "tv"):
+                    continue
+                try:
+                    if int(it.get("id") or 0) <= 0:
                         continue
-                    week.append(it)
-                if week:
-                    for it in week:
-                        c = tmdb_card(it)
-                        if c:
-                            trending_today.append(self.app._enrich_card(con, c, iso639, iso3166))
-
-                if not top10_today:
-                    top10_today = (
-                        movie_cards("SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 10")
-                        + series_cards("SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 10")
-                    )[:10]
-
-                if not trending_today:
-                    trending_today = (
-                        movie_cards("SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 30")
-                        + series_cards("SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 30")
-                    )[:30]
-            else:
-                slider = (
-                    movie_cards_with_desc("SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 10")
-                    + series_cards_with_desc("SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 10")
-                )[:10]
-                top10_today = (
-                    movie_cards("SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 10")
-                    + series_cards("SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 10")
+                except Exception:
+                    continue
+                week.append(it)
+            if week:
+                cards = [c for c in (tmdb_card(it) for it in week) if c]
+                trending_today = self.app._enrich_cards(con, cards, iso639, iso3166)
+
+            if not top10_today:
+                top10_today = (movie_cards(_SQL_MOVIES_BY_POP_10) + series_cards(_SQL_SERIES_BY_POP_10))[:10]
+
+            if not trending_today:
+                trending_today = (movie_cards(_SQL_MOVIES_BY_POP_30) + series_cards(_SQL_SERIES_BY_POP_30))[:30]
+        else:
+            slider = (
+                movie_cards_with_desc(_SQL_MOVIES_BY_POP_10) + series_cards_with_desc(_SQL_SERIES_BY_POP_10)
+            )[:10]
+            top10_today = (movie_cards(_SQL_MOVIES_BY_POP_10) + series_cards(_SQL_SERIES_BY_POP_10))[:10]
+            trending_today = (movie_cards(_SQL_MOVIES_BY_POP_30) + series_cards(_SQL_SERIES_BY_POP_30))[:30]
+
+        series_on = {}
+        if "networks" in self.app.series_cols:
+            for p in PROVIDERS:
+                needles = PROVIDER_NEEDLES.get(p) or (p,)
+                params = tuple(f"%{n}%" for n in needles)
+                series_on[p] = series_cards(_series_on_sql(len(needles)), params)
+        else:
+            for p in PROVIDERS:
+                series_on[p] = []
+
+        top_rated = {
+            "movies": movie_cards(_SQL_TOP_RATED_MOVIES),
+            "series": series_cards(_SQL_TOP_RATED_SERIES),
+        }
+
+        genres = {}
+        if self.app.has_genres and self.app.has_title_genres:
+            for k, needles in HOME_GENRES.items():
+                names = tuple(needles) if isinstance(needles, (tuple, list)) else (str(needles),)
+                if not names:
+                    genres[k] = []
+                    continue
+                ph = ",".join("?" for _ in names)
+                sql = f"""
+                SELECT DISTINCT id,kind,name,dt,rating,pop,poster,backdrop,logos FROM (
+                  SELECT m.id id,'movie' kind,m.title name,m.release_date dt,m.vote_average rating,COALESCE(m.popularity,0) pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos
+                  FROM movies m
+                  JOIN title_genres tg ON tg.media_type='movie' AND tg.tmdb_id=m.id
+                  JOIN genres g ON g.media_type='movie' AND g.genre_id=tg.genre_id
+                  WHERE g.name IN ({ph})
+                  UNION ALL
+                  SELECT s.id id,'series' kind,s.name name,s.first_air_date dt,s.vote_average rating,COALESCE(s.popularity,0) pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos
+                  FROM series s
+                  JOIN title_genres tg ON tg.media_type='tv' AND tg.tmdb_id=s.id
+                  JOIN genres g ON g.media_type='tv' AND g.genre_id=tg.genre_id
+                  WHERE g.name IN ({ph})
                 )
-                top10_today = top10_today[:10]
-                trending_today = (
-                    movie_cards("SELECT * FROM movies ORDER BY COALESCE(popularity,0) DESC LIMIT 30")
-                    + series_cards("SELECT * FROM series ORDER BY COALESCE(popularity,0) DESC LIMIT 30")
+                ORDER BY COALESCE(pop,0) DESC
+                LIMIT 18
+                """.strip()
+                rows = [dict(r) for r in con.execute(sql, (*names, *names)).fetchall()]
+                tr = self.app._translated_batch(
+                    con,
+                    [("movie" if r["kind"] == "movie" else "tv", int(r["id"])) for r in rows],
+                    iso639,
+                    iso3166,
                 )
-                trending_today = trending_today[:30]
-
-            series_on = {}
-            if "networks" in self.app.series_cols:
-                for p in PROVIDERS:
-                    needles = PROVIDER_NEEDLES.get(p) or (p,)
-                    where = " OR ".join("COALESCE(networks,'') LIKE ?" for _ in needles)
-                    params = tuple(f"%{n}%" for n in needles)
-                    series_on[p] = series_cards(
-                        f"SELECT * FROM series WHERE {where} ORDER BY COALESCE(popularity,0) DESC LIMIT 18",
-                        params,
-                    )
-            else:
-                for p in PROVIDERS:
-                    series_on[p] = []
-
-            top_rated = {
-                "movies": movie_cards(
-                    """
-                    SELECT * FROM (
-                      SELECT * FROM movies ORDER BY COALESCE(vote_average,0) DESC LIMIT 48
-                    ) ORDER BY COALESCE(vote_count,0) DESC LIMIT 12
-                    """.strip()
-                ),
-                "series": series_cards(
-                    """
-                    SELECT * FROM (
-                      SELECT * FROM series ORDER BY COALESCE(vote_average,0) DESC LIMIT 48
-                    ) ORDER BY COALESCE(vote_count,0) DESC LIMIT 12
-                    """.strip()
-                ),
-            }
-
-            genres = {}
-            if self.app.has_genres and self.app.has_title_genres:
-                for k, needles in HOME_GENRES.items():
-                    names = tuple(needles) if isinstance(needles, (tuple, list)) else (str(needles),)
-                    if not names:
-                        genres[k] = []
-                        continue
-                    ph = ",".join("?" for _ in names)
-                    sql = f"""
-                    SELECT DISTINCT id,kind,name,dt,rating,pop,poster,backdrop,logos FROM (
-                      SELECT m.id id,'movie' kind,m.title name,m.release_date dt,m.vote_average rating,COALESCE(m.popularity,0) pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos
-                      FROM movies m
-                      JOIN title_genres tg ON tg.media_type='movie' AND tg.tmdb_id=m.id
-                      JOIN genres g ON g.media_type='movie' AND g.genre_id=tg.genre_id
-                      WHERE g.name IN ({ph})
-                      UNION ALL
-                      SELECT s.id id,'series' kind,s.name name,s.first_air_date dt,s.vote_average rating,COALESCE(s.popularity,0) pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos
-                      FROM series s
-                      JOIN title_genres tg ON tg.media_type='tv' AND tg.tmdb_id=s.id
-                      JOIN genres g ON g.media_type='tv' AND g.genre_id=tg.genre_id
-                      WHERE g.name IN ({ph})
+                out = []
+                for r in rows:
+                    kind = r["kind"]
+                    tid = int(r["id"])
+                    media_type = "movie" if kind == "movie" else "tv"
+                    t_title, _ = tr.get((media_type, tid), (None, None))
+                    out.append(
+                        {
+                            "id": tid,
+                            "kind": kind,
+                            "name": (t_title or r.get("name") or "").strip(),
+                            "year": _year(r.get("dt")),
+                            "rating": r.get("rating"),
+                            "poster": r.get("poster"),
+                            "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
+                            "backdrop": r.get("backdrop"),
+                        }
                     )
-                    ORDER BY COALESCE(pop,0) DESC
-                    LIMIT 18
-                    """.strip()
-                    rows = [dict(r) for r in con.execute(sql, (*names, *names)).fetchall()]
-                    out = []
-                    for r in rows:
-                        kind = r["kind"]
-                        tid = int(r["id"])
-                        media_type = "movie" if kind == "movie" else "tv"
-                        t_title, _ = self.app._translated(con, media_type, tid, iso639, iso3166)
-                        out.append(
-                            {
-                                "id": tid,
-                                "kind": kind,
-                                "name": (t_title or r.get("name") or "").strip(),
-                                "year": _year(r.get("dt")),
-                                "rating": r.get("rating"),
-                                "poster": r.get("poster"),
-                                "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
-                                "backdrop": r.get("backdrop"),
-                            }
-                        )
-                    genres[k] = out
-            elif "genres" in self.app.movies_cols or "genres" in self.app.series_cols:
-                for k, needles in HOME_GENRES.items():
-                    names = tuple(needles) if isinstance(needles, (tuple, list)) else (str(needles),)
-                    mv_gen = "genres" if "genres" in self.app.movies_cols else "''"
-                    tv_gen = "genres" if "genres" in self.app.series_cols else "''"
-                    where = " OR ".join("COALESCE(gen,'') LIKE ?" for _ in names) if names else "1=0"
-                    sql = f"""
-                    SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos FROM (
-                      SELECT id,'movie' kind,title name,release_date dt,vote_average rating,COALESCE(popularity,0) pop,poster_path poster,backdrop_path backdrop,logos_json logos,{mv_gen} gen
-                      FROM movies
-                      UNION ALL
-                      SELECT id,'series' kind,name name,first_air_date dt,vote_average rating,COALESCE(popularity,0) pop,poster_path poster,backdrop_path backdrop,logos_json logos,{tv_gen} gen
-                      FROM series
+                genres[k] = out
+        elif "genres" in self.app.movies_cols or "genres" in self.app.series_cols:
+            for k, needles in HOME_GENRES.items():
+                names = tuple(needles) if isinstance(needles, (tuple, list)) else (str(needles),)
+                mv_gen = "genres" if "genres" in self.app.movies_cols else "''"
+                tv_gen = "genres" if "genres" in self.app.series_cols else "''"
+                where = " OR ".join("COALESCE(gen,'') LIKE ?" for _ in names) if names else "1=0"
+                sql = f"""
+                SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos FROM (
+                  SELECT id,'movie' kind,title name,release_date dt,vote_average rating,COALESCE(popularity,0) pop,poster_path poster,backdrop_path backdrop,logos_json logos,{mv_gen} gen
+                  FROM movies
+                  UNION ALL
+                  SELECT id,'series' kind,name name,first_air_date dt,vote_average rating,COALESCE(popularity,0) pop,poster_path poster,backdrop_path backdrop,logos_json logos,{tv_gen} gen
+                  FROM series
+                )
+                WHERE {where}
+                ORDER BY COALESCE(pop,0) DESC
+                LIMIT 18
+                """.strip()
+                params = tuple(f"%{n}%" for n in names)
+                rows = [dict(r) for r in con.execute(sql, params).fetchall()]
+                tr = self.app._translated_batch(
+                    con,
+                    [("movie" if r["kind"] == "movie" else "tv", int(r["id"])) for r in rows],
+                    iso639,
+                    iso3166,
+                )
+                out = []
+                for r in rows:
+                    kind = r["kind"]
+                    tid = int(r["id"])
+                    media_type = "movie" if kind == "movie" else "tv"
+                    t_title, _ = tr.get((media_type, tid), (None, None))
+                    out.append(
+                        {
+                            "id": tid,
+                            "kind": kind,
+                            "name": (t_title or r.get("name") or "").strip(),
+                            "year": _year(r.get("dt")),
+                            "rating": r.get("rating"),
+                            "poster": r.get("poster"),
+                            "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
+                            "backdrop": r.get("backdrop"),
+                        }
                     )
-                    WHERE {where}
-                    ORDER BY COALESCE(pop,0) DESC
-                    LIMIT 18
-                    """.strip()
-                    params = tuple(f"%{n}%" for n in names)
-                    rows = [dict(r) for r in con.execute(sql, params).fetchall()]
-                    out = []
-                    for r in rows:
-                        kind = r["kind"]
-                        tid = int(r["id"])
-                        media_type = "movie" if kind == "movie" else "tv"
-                        t_title, _ = self.app._translated(con, media_type, tid, iso639, iso3166)
-                        out.append(
-                            {
-                                "id": tid,
-                                "kind": kind,
-                                "name": (t_title or r.get("name") or "").strip(),
-                                "year": _year(r.get("dt")),
-                                "rating": r.get("rating"),
-                                "poster": r.get("poster"),
-                                "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
-                                "backdrop": r.get("backdrop"),
-                            }
-                        )
-                    genres[k] = out
-            else:
-                for k in HOME_GENRES.keys():
-                    genres[k] = []
-
-            out = {
-                "as_of": int(time.time()),
-                "providers": list(PROVIDERS),
-                "slider": slider,
-                "top10_today": top10_today,
-                "trending_today": trending_today,
-                "series_on": series_on,
-                "top_rated": top_rated,
-                "genres": genres,
-            }
-            with self.app.home_lock:
-                self.app.home_cache[lang_tag] = (time.time(), out)
-            return out
-        finally:
-            con.close()
+                genres[k] = out
+        else:
+            for k in HOME_GENRES.keys():
+                genres[k] = []
+
+        out = {
+            "as_of": int(time.time()),
+            "providers": list(PROVIDERS),
+            "slider": slider,
+            "top10_today": top10_today,
+            "trending_today": trending_today,
+            "series_on": series_on,
+            "top_rated": top_rated,
+            "genres": genres,
+        }
+        raw = _dumps(out)
+        gz = _gz_compress(raw)
+        with self.app.home_lock:
+            self.app.home_cache[lang_tag] = (time.time(), out, raw, gz, None)
+        self._queue_brotli(self.app.home_cache, self.app.home_lock, lang_tag, raw)
+        return out
 
     def app_home_bytes(self, iso639: str, iso3166: str | None, accept_encoding: str | None):
         lang_tag = _lang_tag(iso639, iso3166)
         now = time.time()
         with self.app.home_lock:
             cur = self.app.home_cache.get(lang_tag)
-            if cur and (now - cur[0]) < self.app.home_ttl_s and len(cur) >= 5:
-                _ts, _obj, raw, gz, br = cur
+            stale = bool(cur and (now - cur[0]) >= self.app.home_ttl_s)
+            if stale and lang_tag not in self.app.home_refresh_inflight:
+                self.app.home_refresh_inflight.add(lang_tag)
+                self.app.backfill_ex.submit(self._refresh_home, lang_tag)
+
+        if cur is None:
+            self.app_home(iso639, iso3166)
+            with self.app.home_lock:
+                cur = self.app.home_cache[lang_tag]
+
+        _ts, _obj, raw, gz, br = cur
+        return _pick_encoding(raw, gz, br, accept_encoding)
+
+    def app_browse_bytes(self, tab: str, page: int, iso639: str, iso3166: str | None, accept_encoding: str | None, cursor: str | None = None):
+        key = (tab, page, _lang_tag(iso639, iso3166), cursor or "")
+        now = time.time()
+        with self.app.browse_lock:
+            cur = self.app.browse_cache.get(key)
+            if cur and (now - cur[0]) < self.app.browse_ttl_s:
+                _ts, raw, gz, br = cur
             else:
                 cur = None
 
         if cur is None:
-            obj = self.app_home(iso639, iso3166)
-            raw = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
-            gz = gzip.compress(raw, compresslevel=5)
-            br = _br_compress(raw)
-            with self.app.home_lock:
-                cur = self.app.home_cache.get(lang_tag)
-                if cur and len(cur) >= 2:
-                    ts, obj0 = cur[0], cur[1]
-                    self.app.home_cache[lang_tag] = (ts, obj0, raw, gz, br)
-                else:
-                    self.app.home_cache[lang_tag] = (time.time(), obj, raw, gz, br)
+            obj = self.app_browse(tab, page, iso639, iso3166, cursor)
+            if obj is None:
+                return None
+            raw = _dumps(obj)
+            gz = _gz_compress(raw)
+            br = None
+            if obj.get("has_more") or page == 1:
+                with self.app.browse_lock:
+                    while len(self.app.browse_cache) > 1024:
+                        del self.app.browse_cache[next(iter(self.app.browse_cache))]
+                    self.app.browse_cache[key] = (now, raw, gz, br)
+                self._queue_brotli(self.app.browse_cache, self.app.browse_lock, key, raw)
+
+        return _pick_encoding(raw, gz, br, accept_encoding)
+
+    def app_search_page_bytes(self, iso639: str, iso3166: str | None, accept_encoding: str | None):
+        key = _lang_tag(iso639, iso3166)
+        now = time.time()
+        with self.app.browse_lock:
+            cur = self.app.search_page_cache.get(key)
+            if cur and (now - cur[0]) < self.app.browse_ttl_s:
+                _ts, raw, gz, br = cur
+            else:
+                cur = None
+
+        if cur is None:
+            raw = _dumps(self.app_search_page(iso639, iso3166))
+            gz = _gz_compress(raw)
+            br = None
+            with self.app.browse_lock:
+                if len(self.app.search_page_cache) > 64:
+                    self.app.search_page_cache.clear()
+                self.app.search_page_cache[key] = (now, raw, gz, br)
+            self._queue_brotli(self.app.search_page_cache, self.app.browse_lock, key, raw)
 
-        ae = (accept_encoding or "").lower()
-        if "br" in ae and br:
-            return (br, "br")
-        if "gzip" in ae:
-            return (gz, "gzip")
-        return (raw, None)
+        return _pick_encoding(raw, gz, br, accept_encoding)
 
     def app_title(self, tid: int, iso639: str, iso3166: str | None):
         con = self.app._con()
-        try:
-            lang_tag = _lang_tag(iso639, iso3166)
-            m0 = con.execute("SELECT * FROM movies WHERE id=? LIMIT 1", (tid,)).fetchone()
-            if m0:
-                if self.app._missing_parts(con, "movie", tid, iso639, iso3166, full=True):
-                    self.app._schedule_backfill("movie", tid, iso639, iso3166, full=True)
-                m = dict(m0)
-                media_type = "movie"
-                kind = "movie"
-                base_name = m.get("title")
-                base_over = m.get("overview")
-                date_val = m.get("release_date")
-                poster = m.get("poster_path")
-                backdrop = m.get("backdrop_path")
-                rating = m.get("vote_average")
-                genres = m.get("genres") or ""
-                logos_json = m.get("logos_json")
+        lang_tag = _lang_tag(iso639, iso3166)
+        remote_title = None
+        m0 = con.execute(_SQL_MOVIE_BY_ID, (tid,)).fetchone()
+        if m0:
+            if self.app._missing_parts(con, "movie", tid, iso639, iso3166, full=True):
+                self.app._schedule_backfill("movie", tid, iso639, iso3166, full=True)
+            m = dict(m0)
+            media_type = "movie"
+            kind = "movie"
+            base_name = m.get("title")
+            base_over = m.get("overview")
+            date_val = m.get("release_date")
+            poster = m.get("poster_path")
+            backdrop = m.get("backdrop_path")
+            rating = m.get("vote_average")
+            genres = m.get("genres") or ""
+            genres_json = m.get("genres_json")
+            logos_json = m.get("logos_json")
+        else:
+            s0 = con.execute(_SQL_SERIES_BY_ID, (tid,)).fetchone()
+            if s0:
+                if self.app._missing_parts(con, "tv", tid, iso639, iso3166, full=True):
+                    self.app._schedule_backfill("tv", tid, iso639, iso3166, full=True)
+                s = dict(s0)
+                media_type = "tv"
+                kind = "series"
+                base_name = s.get("name")
+                base_over = s.get("overview")
+                date_val = s.get("first_air_date")
+                poster = s.get("poster_path")
+                backdrop = s.get("backdrop_path")
+                rating = s.get("vote_average")
+                genres = s.get("genres") or ""
+                genres_json = s.get("genres_json")
+                logos_json = s.get("logos_json")
             else:
-                s0 = con.execute("SELECT * FROM series WHERE id=? LIMIT 1", (tid,)).fetchone()
-                if s0:
-                    if self.app._missing_parts(con, "tv", tid, iso639, iso3166, full=True):
-                        self.app._schedule_backfill("tv", tid, iso639, iso3166, full=True)
-                    s = dict(s0)
+                mt, st, data = self.app._tmdb_fetch_title_any(tid, lang_tag)
+                if st != 200 or not data or mt not in ("movie", "tv"):
+                    return None
+                season = None
+                if mt == "tv" and (self.app.has_seasons or self.app.has_episodes):
+                    season = self.app._tmdb_first_season(tid, lang_tag, data)
+                remote_title = (data, season)
+                self.app._enqueue_title_upsert(mt, tid, lang_tag, data, season)
+                self.app._schedule_backfill(mt, tid, iso639, iso3166, full=True)
+                genres = ", ".join(
+                    g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")
+                )
+                if mt == "movie":
+                    media_type = "movie"
+                    kind = "movie"
+                    base_name = data.get("title")
+                    date_val = data.get("release_date")
+                else:
                     media_type = "tv"
                     kind = "series"
-                    base_name = s.get("name")
-                    base_over = s.get("overview")
-                    date_val = s.get("first_air_date")
-                    poster = s.get("poster_path")
-                    backdrop = s.get("backdrop_path")
-                    rating = s.get("vote_average")
-                    genres = s.get("genres") or ""
-                    logos_json = s.get("logos_json")
+                    base_name = data.get("name")
+                    date_val = data.get("first_air_date")
+                base_over = data.get("overview")
+                poster = data.get("poster_path")
+                backdrop = data.get("backdrop_path")
+                rating = data.get("vote_average")
+                genres_json = None
+                logos_json = None
+
+        t_title, t_over = self.app._translated(con, media_type, tid, iso639, iso3166)
+        name = (t_title or base_name or "").strip()
+        description = (t_over or base_over or "").strip()
+
+        trailer = None
+        seasons = []
+        cast = []
+        parts = []
+        fused_params: list = []
+        if self.app.has_videos:
+            parts.append(
+                "SELECT * FROM (SELECT 'v' tag, key c1, site c2, NULL c3, NULL c4 FROM title_videos WHERE media_type=? AND tmdb_id=? LIMIT 1)"
+            )
+            fused_params += (media_type, tid)
+        if kind == "series" and remote_title is None and self.app.has_seasons:
+            parts.append(
+                "SELECT * FROM (SELECT 'se' tag, season_number c1, episode_count c2, NULL c3, NULL c4 FROM tv_seasons WHERE series_id=? ORDER BY season_number ASC)"
+            )
+            fused_params.append(tid)
+        if self.app.has_cast:
+            parts.append(
+                "SELECT * FROM (SELECT 'c' tag, name c1, character c2, ord c3, profile_path c4 FROM title_cast WHERE media_type=? AND tmdb_id=? ORDER BY COALESCE(ord,9999) ASC LIMIT 24)"
+            )
+            fused_params += (media_type, tid)
+        if parts:
+            for (tag, c1, c2, c3, c4) in con.execute(" UNION ALL ".join(parts), fused_params):
+                if tag == "v":
+                    if trailer is None and (c2 or "").lower() == "youtube" and c1:
+                        trailer = {"key": c1, "url": f"https://www.youtube.com/watch?v={c1}"}
+                elif tag == "se":
+                    seasons.append({"season": int(c1), "episode_count": int(c2 or 0)})
                 else:
-                    mt, st, data = self.app._tmdb_fetch_title_any(tid, lang_tag)
-                    if st != 200 or not data or mt not in ("movie", "tv"):
-                        return None
-                    self.app._upsert_tmdb_base(con, mt, tid, data)
-                    if mt == "tv":
-                        self.app._upsert_tmdb_tv_seasons_episodes(con, tid, lang_tag, data)
-                    con.commit()
-                    if self.app._missing_parts(con, mt, tid, iso639, iso3166, full=True):
-                        self.app._schedule_backfill(mt, tid, iso639, iso3166, full=True)
-                    if mt == "movie":
-                        m0 = con.execute("SELECT * FROM movies WHERE id=? LIMIT 1", (tid,)).fetchone()
-                        m = dict(m0) if m0 else {}
-                        media_type = "movie"
-                        kind = "movie"
-                        base_name = m.get("title") or data.get("title")
-                        base_over = m.get("overview") or data.get("overview")
-                        date_val = m.get("release_date") or data.get("release_date")
-                        poster = m.get("poster_path") or data.get("poster_path")
-                        backdrop = m.get("backdrop_path") or data.get("backdrop_path")
-                        rating = m.get("vote_average") if m.get("vote_average") is not None else data.get("vote_average")
-                        genres = m.get("genres") or ", ".join(
-                            g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")
-                        )
-                        logos_json = m.get("logos_json")
-                    else:
-                        s0 = con.execute("SELECT * FROM series WHERE id=? LIMIT 1", (tid,)).fetchone()
-                        s = dict(s0) if s0 else {}
-                        media_type = "tv"
-                        kind = "series"
-                        base_name = s.get("name") or data.get("name")
-                        base_over = s.get("overview") or data.get("overview")
-                        date_val = s.get("first_air_date") or data.get("first_air_date")
-                        poster = s.get("poster_path") or data.get("poster_path")
-                        backdrop = s.get("backdrop_path") or data.get("backdrop_path")
-                        rating = s.get("vote_average") if s.get("vote_average") is not None else data.get("vote_average")
-                        genres = s.get("genres") or ", ".join(
-                            g.get("name") for g in (data.get("genres") or []) if isinstance(g, dict) and g.get("name")
-                        )
-                        logos_json = s.get("logos_json")
-
-            t_title, t_over = self.app._translated(con, media_type, tid, iso639, iso3166)
-            name = (t_title or base_name or "").strip()
-            description = (t_over or base_over or "").strip()
-
-            trailer = None
-            if self.app.has_videos:
-                v0 = con.execute(
-                    """
-                    SELECT key, site
-                    FROM title_videos
-                    WHERE media_type=? AND tmdb_id=?
-                    LIMIT 1
-                    """.strip(),
-                    (media_type, tid),
-                ).fetchone()
-                v = dict(v0) if v0 else None
-                if v and (v.get("site") or "").lower() == "youtube" and v.get("key"):
-                    k = v.get("key")
-                    trailer = {"key": k, "url": f"https://www.youtube.com/watch?v={k}"}
-
-            seasons = []
-            prefetch_season = None
-            prefetch_episodes = []
-            if kind == "series" and self.app.has_seasons:
-                seasons = [
-                    {
-                        "season": int(r["season_number"]),
-                        "episode_count": int(r["episode_count"] or 0),
-                    }
-                    for r in con.execute(
-                        "SELECT season_number, episode_count FROM tv_seasons WHERE series_id=? ORDER BY season_number ASC",
-                        (tid,),
+                    cast.append(
+                        {
+                            "name": (c1 or "").strip(),
+                            "role": (c2 or "").strip(),
+                            "order": int(c3 or 0),
+                            "profile": c4,
+                        }
                     )
-                ]
-            if kind == "series" and self.app.has_episodes:
-                sn = None
-                for se in seasons:
-                    if int(se.get("season") or 0) > 0:
-                        sn = int(se["season"])
-                        break
-                if sn is None:
-                    r0 = con.execute(
-                        "SELECT MIN(season_number) sn FROM tv_episodes WHERE series_id=? AND season_number>0",
-                        (tid,),
-                    ).fetchone()
-                    sn = int((dict(r0).get("sn") if r0 else 0) or 0) or None
-                if sn is not None:
-                    rows = con.execute(
-                        """
-                        SELECT episode_number, name, runtime, still_path
-                        FROM tv_episodes
-                        WHERE series_id=? AND season_number=?
-                        ORDER BY episode_number ASC
-                        """.strip(),
-                        (tid, sn),
-                    ).fetchall()
-                    prefetch_season = sn
-                    for r0 in rows:
-                        r = dict(r0)
+
+        prefetch_season = None
+        prefetch_episodes = []
+        if kind == "series" and remote_title is not None:
+            data, season = remote_title
+            for se in data.get("seasons") or []:
+                if not isinstance(se, dict):
+                    continue
+                sn = int(se.get("season_number") or 0)
+                if sn <= 0:
+                    continue
+                seasons.append({"season": sn, "episode_count": int(se.get("episode_count") or 0)})
+            if season:
+                sn, sdata = season
+                if sn is not None and sdata:
+                    prefetch_season = int(sn)
+                    for ep in sdata.get("episodes") or []:
+                        if not isinstance(ep, dict):
+                            continue
+                        en = int(ep.get("episode_number") or 0)
+                        if en <= 0:
+                            continue
                         prefetch_episodes.append(
                             {
-                                "episode": int(r["episode_number"]),
-                                "name": (r.get("name") or "").strip(),
-                                "runtime_min": r.get("runtime"),
-                                "still": r.get("still_path"),
+                                "episode": en,
+                                "name": (ep.get("name") or "").strip(),
+                                "runtime_min": ep.get("runtime"),
+                                "still": ep.get("still_path"),
                             }
                         )
+        if kind == "series" and remote_title is None and self.app.has_episodes:
+            sql = _SQL_PREFETCH_EPISODES if self.app.has_seasons else _SQL_PREFETCH_EPISODES_NO_SEASONS
+            params = (tid, tid, tid) if self.app.has_seasons else (tid, tid)
+            for (sn, en, nm, rt, sp) in con.execute(sql, params):
+                if sn is None:
+                    break
+                prefetch_season = int(sn)
+                if en is None:
+                    break
+                prefetch_episodes.append(
+                    {
+                        "episode": int(en),
+                        "name": (nm or "").strip(),
+                        "runtime_min": rt,
+                        "still": sp,
+                    }
+                )
 
-            cast = []
-            if self.app.has_cast:
-                for r in con.execute(
-                    """
-                    SELECT name, character, ord, profile_path
-                    FROM title_cast
-                    WHERE media_type=? AND tmdb_id=?
-                    ORDER BY COALESCE(ord,9999) ASC
-                    LIMIT 24
-                    """.strip(),
-                    (media_type, tid),
-                ):
-                    r = dict(r)
-                    cast.append(
-                        {
-                            "name": (r.get("name") or "").strip(),
-                            "role": (r.get("character") or "").strip(),
-                            "order": int(r.get("ord") or 0),
-                            "profile": r.get("profile_path"),
-                        }
-                    )
-
+        tags = _json_loads_best_effort(genres_json) if genres_json else None
+        if not isinstance(tags, list):
             tags = [t.strip() for t in genres.split(",") if t.strip()] if genres else []
 
-            return {
-                "id": tid,
-                "kind": kind,
-                "name": name,
-                "description": description,
-                "tags": tags,
-                "year": _year(date_val),
-                "runtime_min": None,
-                "rating": rating,
-                "poster": poster,
-                "logo": _pick_logo(logos_json, iso639),
-                "backdrop": backdrop,
-                "trailer_youtube": trailer,
-                "seasons": seasons,
-                "prefetch_season": prefetch_season,
-                "prefetch_episodes": prefetch_episodes,
-                "cast": cast,
-                "similar": self.app._tmdb_similar(kind, tid, iso639, iso3166),
-            }
-        finally:
-            con.close()
-
-    def app_browse(self, tab: str, page: int, iso639: str, iso3166: str | None):
+        return {
+            "id": tid,
+            "kind": kind,
+            "name": name,
+            "description": description,
+            "tags": tags,
+            "year": _year(date_val),
+            "runtime_min": None,
+            "rating": rating,
+            "poster": poster,
+            "logo": _pick_logo(logos_json, iso639),
+            "backdrop": backdrop,
+            "trailer_youtube": trailer,
+            "seasons": seasons,
+            "prefetch_season": prefetch_season,
+            "prefetch_episodes": prefetch_episodes,
+            "cast": cast,
+            "similar": self.app._tmdb_similar(kind, tid, iso639, iso3166),
+        }
+
+    def app_browse(self, tab: str, page: int, iso639: str, iso3166: str | None, cursor: str | None = None):
         if page < 1:
             return None
         spec = BROWSE_TABS.get(tab)
@@ -821,141 +1039,155 @@ class APIServer(ThreadingHTTPServer):
         mode, arg = spec
         limit = self.app.page_size + 1
         offset = (page - 1) * self.app.page_size
+        ks = _decode_cursor(cursor) if mode in ("popular", "genre") else None
+        if ks:
+            offset = 0
 
-        def union_sql(where_movies: str, where_series: str, order_by: str, params: tuple):
+        def union_sql(where_movies: str, where_series: str, order_by: str, order_movies: str, order_series: str, params_movies: tuple, params_series: tuple):
             mv_gen = "genres" if "genres" in self.app.movies_cols else "''"
             tv_gen = "genres" if "genres" in self.app.series_cols else "''"
+            if self.app.has_translations:
+                tr = (iso639, iso3166 or "")
+                name_m = f"COALESCE({_tr_title_expr('movie', 'movies.id')},title)"
+                name_s = f"COALESCE({_tr_title_expr('tv', 'series.id')},name)"
+            else:
+                tr = ()
+                name_m = "title"
+                name_s = "name"
+            branch_limit = limit + offset
             return (
-                f"""
-                SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos,gen FROM (
-                  SELECT id,'movie' kind,title name,release_date dt,vote_average rating,popularity pop,poster_path poster,backdrop_path backdrop,logos_json logos,{mv_gen} gen
-                  FROM movies
-                  {where_movies}
-                  UNION ALL
-                  SELECT id,'series' kind,name name,first_air_date dt,vote_average rating,popularity pop,poster_path poster,backdrop_path backdrop,logos_json logos,{tv_gen} gen
-                  FROM series
-                  {where_series}
-                )
-                ORDER BY {order_by}
-                LIMIT ? OFFSET ?
-                """.strip(),
-                (*params, limit, offset),
+                _union_sql_text(where_movies, where_series, order_by, order_movies, order_series, mv_gen, tv_gen, name_m, name_s),
+                (*tr, *params_movies, branch_limit, *tr, *params_series, branch_limit, limit, offset),
             )
 
         where_m = ""
         where_s = ""
-        params: tuple = ()
+        params_m: tuple = ()
+        params_s: tuple = ()
         if mode == "genre":
             names = self._genre_needles(arg or "")
             if self.app.has_genres and self.app.has_title_genres and names:
-                ph = ",".join("?" for _ in names)
-                sql = f"""
-                SELECT DISTINCT id,kind,name,dt,rating,pop,poster,backdrop,logos,gen FROM (
-                  SELECT m.id id,'movie' kind,m.title name,m.release_date dt,m.vote_average rating,m.popularity pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos,'' gen
-                  FROM movies m
-                  JOIN title_genres tg ON tg.media_type='movie' AND tg.tmdb_id=m.id
-                  JOIN genres g ON g.media_type='movie' AND g.genre_id=tg.genre_id
-                  WHERE g.name IN ({ph})
-                  UNION ALL
-                  SELECT s.id id,'series' kind,s.name name,s.first_air_date dt,s.vote_average rating,s.popularity pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos,'' gen
-                  FROM series s
-                  JOIN title_genres tg ON tg.media_type='tv' AND tg.tmdb_id=s.id
-                  JOIN genres g ON g.media_type='tv' AND g.genre_id=tg.genre_id
-                  WHERE g.name IN ({ph})
-                )
-                ORDER BY COALESCE(pop,0) DESC
-                LIMIT ? OFFSET ?
-                """.strip()
-                sql_params = (*names, *names, limit, offset)
+                tr = (iso639, iso3166 or "") if self.app.has_translations else ()
+                kp = (ks[0], ks[0], ks[1]) if ks else ()
+                use_rank = not ks and self.app.has_pop_rank
+                sql = _genre_join_sql(len(names), self.app.has_translations, bool(ks), use_rank)
+                sql_params = (*tr, *names, *kp, *tr, *names, *kp, limit, offset)
                 con = self.app._con()
-                try:
-                    rows = con.execute(sql, sql_params).fetchall()
-                    has_more = len(rows) > self.app.page_size
-                    rows = rows[: self.app.page_size]
-                    items = []
-                    for r in rows:
-                        r = dict(r)
-                        kind = r["kind"]
-                        tid = int(r["id"])
-                        media_type = "movie" if kind == "movie" else "tv"
-                        t_title, _t_over = self.app._translated(con, media_type, tid, iso639, iso3166)
-                        name = (t_title or r["name"] or "").strip()
-                        items.append(
-                            {
-                                "id": tid,
-                                "kind": kind,
-                                "name": name,
-                                "year": _year(r.get("dt")),
-                                "rating": r.get("rating"),
-                                "poster": r.get("poster"),
-                                "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
-                                "backdrop": r.get("backdrop"),
-                            }
+                cur = con.execute(sql, sql_params)
+                rows = cur.fetchmany(self.app.page_size)
+                has_more = cur.fetchone() is not None
+                cur.close()
+                items = []
+                for (tid, kind, name_raw, dt, rating, _pop, poster, backdrop, logos, _gen) in rows:
+                    items.append(
+                        dict(
+                            zip(
+                                _ITEM_KEYS,
+                                (
+                                    int(tid),
+                                    kind,
+                                    (name_raw or "").strip(),
+                                    _year(dt),
+                                    rating,
+                                    poster,
+                                    _pick_logo(logos, iso639) or poster,
+                                    backdrop,
+                                ),
+                            )
                         )
-                    return {
-                        "tab": tab,
-                        "page": page,
-                        "page_size": self.app.page_size,
-                        "has_more": has_more,
-                        "items": items,
-                    }
-                finally:
-                    con.close()
+                    )
+                out = {
+                    "tab": tab,
+                    "page": page,
+                    "page_size": self.app.page_size,
+                    "has_more": has_more,
+                    "items": items,
+                }
+                if has_more and rows and not use_rank:
+                    # rank-ordered pages don't agree with the pop-based keyset
+                    # predicate, so they paginate by page number
+                    out["next_cursor"] = _encode_cursor(rows[-1]["pop"], int(rows[-1]["id"]))
+                return out
 
             needle = arg or ""
             if "genres" in self.app.movies_cols:
                 where_m = "WHERE COALESCE(genres,'') LIKE ?"
-                params += (f"%{needle}%",)
+                params_m = (f"%{needle}%",)
             else:
                 where_m = "WHERE 1=0"
             if "genres" in self.app.series_cols:
                 where_s = "WHERE COALESCE(genres,'') LIKE ?"
-                params += (f"%{needle}%",)
+                params_s = (f"%{needle}%",)
             else:
                 where_s = "WHERE 1=0"
 
         order = {
-            "popular": "COALESCE(pop,0) DESC",
+            "popular": "COALESCE(pop,0) DESC, id DESC",
             "rating": "COALESCE(rating,0) DESC, COALESCE(pop,0) DESC",
             "recent": "COALESCE(dt,'') DESC, COALESCE(pop,0) DESC",
-            "genre": "COALESCE(pop,0) DESC",
+            "genre": "COALESCE(pop,0) DESC, id DESC",
+        }[mode]
+        order_m, order_s = {
+            "popular": ("COALESCE(popularity,0) DESC, id DESC", "COALESCE(popularity,0) DESC, id DESC"),
+            "rating": (
+                "COALESCE(vote_average,0) DESC, COALESCE(popularity,0) DESC",
+                "COALESCE(vote_average,0) DESC, COALESCE(popularity,0) DESC",
+            ),
+            "recent": (
+                "COALESCE(release_date,'') DESC, COALESCE(popularity,0) DESC",
+                "COALESCE(first_air_date,'') DESC, COALESCE(popularity,0) DESC",
+            ),
+            "genre": ("COALESCE(popularity,0) DESC, id DESC", "COALESCE(popularity,0) DESC, id DESC"),
         }[mode]
 
-        sql, sql_params = union_sql(where_m, where_s, order, params)
+        if ks:
+            pred = "(COALESCE(popularity,0) < ? OR (COALESCE(popularity,0) = ? AND id < ?))"
+            kp = (ks[0], ks[0], ks[1])
+            where_m = f"{where_m} AND {pred}" if where_m and where_m != "WHERE 1=0" else (where_m or f"WHERE {pred}")
+            where_s = f"{where_s} AND {pred}" if where_s and where_s != "WHERE 1=0" else (where_s or f"WHERE {pred}")
+            if where_m != "WHERE 1=0":
+                params_m += kp
+            if where_s != "WHERE 1=0":
+                params_s += kp
+            order = "COALESCE(pop,0) DESC, id DESC"
+            order_m = "COALESCE(popularity,0) DESC, id DESC"
+            order_s = order_m
+
+        sql, sql_params = union_sql(where_m, where_s, order, order_m, order_s, params_m, params_s)
         con = self.app._con()
-        try:
-            rows = con.execute(sql, sql_params).fetchall()
-            has_more = len(rows) > self.app.page_size
-            rows = rows[: self.app.page_size]
-            items = []
-            for r in rows:
-                r = dict(r)
-                kind = r["kind"]
-                tid = int(r["id"])
-                media_type = "movie" if kind == "movie" else "tv"
-                t_title, _t_over = self.app._translated(con, media_type, tid, iso639, iso3166)
-                name = (t_title or r["name"] or "").strip()
-                items.append(
-                    {
-                        "id": tid,
-                        "kind": kind,
-                        "name": name,
-                        "year": _year(r.get("dt")),
-                        "rating": r.get("rating"),
-                        "poster": r.get("poster"),
-                        "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
-                        "backdrop": r.get("backdrop"),
-                    }
+        cur = con.execute(sql, sql_params)
+        rows = cur.fetchmany(self.app.page_size)
+        has_more = cur.fetchone() is not None
+        cur.close()
+        items = []
+        for (tid, kind, name_raw, dt, rating, _pop, poster, backdrop, logos, _gen) in rows:
+            items.append(
+                dict(
+                    zip(
+                        _ITEM_KEYS,
+                        (
+                            int(tid),
+                            kind,
+                            (name_raw or "").strip(),
+                            _year(dt),
+                            rating,
+                            poster,
+                            _pick_logo(logos, iso639) or poster,
+                            backdrop,
+                        ),
+                    )
                 )
-            return {
-                "tab": tab,
-                "page": page,
-                "page_size": self.app.page_size,
-                "has_more": has_more,
-                "items": items,
-            }
-        finally:
-            con.close()
+            )
+        out = {
+            "tab": tab,
+            "page": page,
+            "page_size": self.app.page_size,
+            "has_more": has_more,
+            "items": items,
+        }
+        if has_more and rows and mode in ("popular", "genre"):
+            out["next_cursor"] = _encode_cursor(rows[-1]["pop"], int(rows[-1]["id"]))
+        return out
 
     def app_search_page(self, iso639: str, iso3166: str | None):
         home = self.app_home(iso639, iso3166)
@@ -968,51 +1200,96 @@ class APIServer(ThreadingHTTPServer):
         like = f"%{q}%"
         limit = 12
         con = self.app._con()
-        try:
-            sql = """
+        if self.app.has_fts:
+            match = '"' + q.replace('"', '""') + '"*'
+            if self.app.has_translations:
+                tr = (iso639, iso3166 or "")
+                name_m = f"COALESCE({_tr_title_expr('movie', 'm.id')},m.title)"
+                name_s = f"COALESCE({_tr_title_expr('tv', 's.id')},s.name)"
+            else:
+                tr = ()
+                name_m = "m.title"
+                name_s = "s.name"
+            sql = f"""
             SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos FROM (
-              SELECT m.id id,'movie' kind,
-                     m.title base_name,m.overview base_over,
-                     tt.title tr_name,tt.overview tr_over,
-                     COALESCE(tt.title,m.title) name,
-                     m.release_date dt,m.vote_average rating,m.popularity pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos
+              SELECT m.id id,'movie' kind,{name_m} name,m.release_date dt,m.vote_average rating,m.popularity pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos
               FROM movies m
-              LEFT JOIN title_translations tt
-                ON tt.media_type='movie' AND tt.tmdb_id=m.id AND tt.iso_639_1=?
+              WHERE m.id IN (SELECT tmdb_id FROM catalog_fts WHERE catalog_fts MATCH ? AND media_type='movie')
               UNION ALL
-              SELECT s.id id,'series' kind,
-                     s.name base_name,s.overview base_over,
-                     tt.title tr_name,tt.overview tr_over,
-                     COALESCE(tt.title,s.name) name,
-                     s.first_air_date dt,s.vote_average rating,s.popularity pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos
+              SELECT s.id id,'series' kind,{name_s} name,s.first_air_date dt,s.vote_average rating,s.popularity pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos
               FROM series s
-              LEFT JOIN title_translations tt
-                ON tt.media_type='tv' AND tt.tmdb_id=s.id AND tt.iso_639_1=?
+              WHERE s.id IN (SELECT tmdb_id FROM catalog_fts WHERE catalog_fts MATCH ? AND media_type='tv')
             )
-            WHERE COALESCE(tr_name,'') LIKE ? OR COALESCE(tr_over,'') LIKE ?
-               OR COALESCE(base_name,'') LIKE ? OR COALESCE(base_over,'') LIKE ?
             ORDER BY COALESCE(pop,0) DESC
             LIMIT ?
             """.strip()
-            rows = con.execute(sql, (iso639, iso639, like, like, like, like, limit)).fetchall()
+            rows = con.execute(sql, (*tr, match, *tr, match, limit)).fetchall()
             out = []
-            for r0 in rows:
-                r = dict(r0)
+            for (tid, kind, name_raw, dt, rating, _pop, poster, backdrop, logos) in rows:
                 out.append(
-                    {
-                        "id": int(r["id"]),
-                        "kind": r["kind"],
-                        "name": (r.get("name") or "").strip(),
-                        "year": _year(r.get("dt")),
-                        "rating": r.get("rating"),
-                        "poster": r.get("poster"),
-                        "logo": _pick_logo(r.get("logos"), iso639) or r.get("poster"),
-                        "backdrop": r.get("backdrop"),
-                    }
+                    dict(
+                        zip(
+                            _ITEM_KEYS,
+                            (
+                                int(tid),
+                                kind,
+                                (name_raw or "").strip(),
+                                _year(dt),
+                                rating,
+                                poster,
+                                _pick_logo(logos, iso639) or poster,
+                                backdrop,
+                            ),
+                        )
+                    )
                 )
             return {"query": q, "results": out}
-        finally:
-            con.close()
+        sql = """
+        SELECT id,kind,name,dt,rating,pop,poster,backdrop,logos FROM (
+          SELECT m.id id,'movie' kind,
+                 m.title base_name,m.overview base_over,
+                 tt.title tr_name,tt.overview tr_over,
+                 COALESCE(tt.title,m.title) name,
+                 m.release_date dt,m.vote_average rating,m.popularity pop,m.poster_path poster,m.backdrop_path backdrop,m.logos_json logos
+          FROM movies m
+          LEFT JOIN title_translations tt
+            ON tt.media_type='movie' AND tt.tmdb_id=m.id AND tt.iso_639_1=?
+          UNION ALL
+          SELECT s.id id,'series' kind,
+                 s.name base_name,s.overview base_over,
+                 tt.title tr_name,tt.overview tr_over,
+                 COALESCE(tt.title,s.name) name,
+                 s.first_air_date dt,s.vote_average rating,s.popularity pop,s.poster_path poster,s.backdrop_path backdrop,s.logos_json logos
+          FROM series s
+          LEFT JOIN title_translations tt
+            ON tt.media_type='tv' AND tt.tmdb_id=s.id AND tt.iso_639_1=?
+        )
+        WHERE COALESCE(tr_name,'') LIKE ? OR COALESCE(tr_over,'') LIKE ?
+           OR COALESCE(base_name,'') LIKE ? OR COALESCE(base_over,'') LIKE ?
+        ORDER BY COALESCE(pop,0) DESC
+        LIMIT ?
+        """.strip()
+        rows = con.execute(sql, (iso639, iso639, like, like, like, like, limit)).fetchall()
+        out = []
+        for (tid, kind, name_raw, dt, rating, _pop, poster, backdrop, logos) in rows:
+            out.append(
+                dict(
+                    zip(
+                        _ITEM_KEYS,
+                        (
+                            int(tid),
+                            kind,
+                            (name_raw or "").strip(),
+                            _year(dt),
+                            rating,
+                            poster,
+                            _pick_logo(logos, iso639) or poster,
+                            backdrop,
+                        ),
+                    )
+                )
+            )
+        return {"query": q, "results": out}
 
 
 class DualStackAPIServer(APIServer):
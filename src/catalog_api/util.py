@@ -1,26 +1,31 @@
 import json
+import re
+
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
+_YEAR_RE = re.compile(r"\d{4}")
 
 
 def _year(d: str | None):
-    if not d or len(d) < 4:
-        return None
-    try:
-        return int(d[:4])
-    except Exception:
+    if not d or not isinstance(d, str):
         return None
+    m = _YEAR_RE.match(d)
+    return int(m.group()) if m else None
 
 
 def _json_loads_best_effort(s: str | None):
     if not s:
         return None
     try:
-        return json.loads(s)
+        return _orjson.loads(s) if _orjson else json.loads(s)
     except Exception:
         return None
 
 
-def _pick_logo(logos_json: str | None, lang: str):
-    d = _json_loads_best_effort(logos_json)
+def _pick_logo_parsed(d: dict | None, lang: str):
     if not isinstance(d, dict):
         return None
     if lang in d and d.get(lang):
@@ -35,19 +40,53 @@ def _pick_logo(logos_json: str | None, lang: str):
     return None
 
 
+def _pick_logo(logos_json: str | None, lang: str):
+    return _pick_logo_parsed(_json_loads_best_effort(logos_json), lang)
+
+
+def _pick_best_logo(data: dict, lang: str) -> str | None:
+    best: tuple[int, str] | None = None
+    best_ar: float | None = None
+    logos = data.get("logos") or []
+    if not isinstance(logos, list):
+        return None
+    for it in logos:
+        if not isinstance(it, dict):
+            continue
+        fp = it.get("file_path")
+        if not fp:
+            continue
+        loc = (it.get("iso_639_1") or "und").strip() or "und"
+        ar = it.get("aspect_ratio")
+        try:
+            ar = float(ar) if ar is not None else None
+        except Exception:
+            ar = None
+        score = 2
+        if loc == lang:
+            score = 0
+        elif loc == "en":
+            score = 1
+        if best is None or score < best[0] or (score == best[0] and ar is not None and (best_ar is None or ar < best_ar)):
+            best = (score, fp)
+            best_ar = ar
+    return best[1] if best else None
+
+
+_DOTENV_RE = re.compile(
+    r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:\"([^\"\n]*)\"|'([^'\n]*)'|([^\n]*?))[ \t\r]*$",
+    re.M,
+)
+
+
 def _load_dotenv(path: str):
-    out = {}
     try:
         with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                s = line.strip()
-                if not s or s.startswith("#") or "=" not in s:
-                    continue
-                k, v = s.split("=", 1)
-                k = k.strip()
-                v = v.strip().strip('"').strip("'")
-                if k:
-                    out[k] = v
+            text = f.read()
     except FileNotFoundError:
         return {}
+    out = {}
+    for m in _DOTENV_RE.finditer(text):
+        dq, sq, bare = m.group(2), m.group(3), m.group(4)
+        out[m.group(1)] = dq if dq is not None else (sq if sq is not None else (bare or ""))
     return out
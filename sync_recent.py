@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
-import json
 import os
+import queue
+import random
 import sqlite3
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
-from threading import Lock, local
+from functools import lru_cache
+from operator import itemgetter
+from threading import Event, Lock, Thread
 from typing import Dict, Iterable, List, Optional, Tuple
 
-import requests
+import orjson
+import urllib3
 
 
 def load_env(path: str) -> Dict[str, str]:
@@ -39,24 +43,46 @@ def pick_token(env: Dict[str, str]) -> Optional[Tuple[str, str]]:
     return None
 
 
-class RateLimiter:
-    def __init__(self, rps: float):
-        self.dt = 1.0 / rps
-        self.lock = Lock()
-        self.next_t = 0.0
-
-    def wait(self):
-        with self.lock:
-            now = time.monotonic()
-            if self.next_t <= now:
-                self.next_t = now + self.dt
-                return
-            t = self.next_t
-            self.next_t += self.dt
-        time.sleep(max(0.0, t - now))
+class AdaptiveLimiter:
+    # Paces off TMDB's own x-ratelimit headers instead of a strict timer:
+    # proceed() is a free Event check until a response reports the window is
+    # nearly exhausted (or a 429 lands), then all workers park until the
+    # advertised reset. Blocking by design - workers are OS threads, so
+    # Event.wait/time.sleep only parks the calling thread; an asyncio port
+    # would need asyncio.Event/sleep here and in the retry backoffs.
+    def __init__(self):
+        self._ok = Event()
+        self._ok.set()
+        self._lock = Lock()
+        self._resume_at = 0.0
+
+    def proceed(self):
+        while not self._ok.is_set():
+            self._ok.wait(timeout=1.0)
+            with self._lock:
+                if time.time() >= self._resume_at:
+                    self._ok.set()
+
+    def observe(self, status: int, headers):
+        try:
+            remaining = int(headers.get("x-ratelimit-remaining") or "10")
+        except ValueError:
+            remaining = 10
+        if status != 429 and remaining > 2:
+            return
+        reset = headers.get("x-ratelimit-reset")
+        try:
+            resume = float(reset)
+        except (TypeError, ValueError):
+            resume = time.time() + 1.0
+        if resume < time.time():
+            resume = time.time() + 1.0
+        with self._lock:
+            self._resume_at = max(self._resume_at, min(resume, time.time() + 30.0))
+        self._ok.clear()
 
 
-def tmdb_get(session: requests.Session, auth: Tuple[str, str], url: str, params: Dict[str, str]):
+def tmdb_get(pool: urllib3.PoolManager, auth: Tuple[str, str], url: str, params: Dict[str, str], limiter: "AdaptiveLimiter | None" = None):
     headers = {"accept": "application/json"}
     p = dict(params)
     if auth[0] == "bearer":
@@ -66,24 +92,26 @@ def tmdb_get(session: requests.Session, auth: Tuple[str, str], url: str, params:
 
     for attempt in range(6):
         try:
-            r = session.get(url, headers=headers, params=p, timeout=25)
-        except requests.RequestException:
-            time.sleep(0.5 * (2**attempt))
+            r = pool.request("GET", url, fields=p, headers=headers, timeout=25)
+        except urllib3.exceptions.HTTPError:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code == 429:
+        if limiter is not None:
+            limiter.observe(r.status, r.headers)
+        if r.status == 429:
             ra = r.headers.get("Retry-After")
-            time.sleep(float(ra) if ra and ra.isdigit() else 1.0)
+            time.sleep(min(float(ra), 30.0) if ra and ra.isdigit() else 1.0)
             continue
-        if 500 <= r.status_code < 600:
-            time.sleep(0.5 * (2**attempt))
+        if 500 <= r.status < 600:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
         return r
     return None
 
 
-def fetch_images(session_factory, limiter: RateLimiter, auth: Tuple[str, str], media_type: str, tmdb_id: int):
-    limiter.wait()
-    url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}/images"
+def fetch_images(pool: urllib3.PoolManager, limiter: AdaptiveLimiter, auth: Tuple[str, str], media_type: str, tmdb_id: int):
+    limiter.proceed()
+    url = TMDB_IMAGES_URL % (media_type, tmdb_id)
     headers = {"accept": "application/json"}
     params = None
     if auth[0] == "bearer":
@@ -93,37 +121,43 @@ def fetch_images(session_factory, limiter: RateLimiter, auth: Tuple[str, str], m
 
     for attempt in range(5):
         try:
-            r = session_factory().get(url, headers=headers, params=params, timeout=25)
-        except requests.RequestException:
-            time.sleep(0.5 * (2**attempt))
+            r = pool.request("GET", url, fields=params, headers=headers, timeout=25)
+        except urllib3.exceptions.HTTPError:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
 
-        if r.status_code == 429:
+        limiter.observe(r.status, r.headers)
+        if r.status == 429:
             ra = r.headers.get("Retry-After")
-            time.sleep(float(ra) if ra and ra.isdigit() else 1.0)
+            time.sleep(min(float(ra), 30.0) if ra and ra.isdigit() else 1.0)
             continue
-        if 500 <= r.status_code < 600:
-            time.sleep(0.5 * (2**attempt))
+        if 500 <= r.status < 600:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code != 200:
+        if r.status != 200:
             return (media_type, tmdb_id, None)
 
         try:
-            data = r.json()
+            data = orjson.loads(r.data)
         except ValueError:
             return (media_type, tmdb_id, None)
 
+        logos = data.get("logos")
+        if not logos:
+            return (media_type, tmdb_id, None)
         best: Dict[str, Tuple[str, float]] = {}
-        for it in data.get("logos") or []:
+        for it in logos:
             fp = it.get("file_path")
+            if not fp:
+                continue
             ar = it.get("aspect_ratio")
-            loc = it.get("iso_639_1") or "und"
-            if not fp or ar is None:
+            if ar is None:
                 continue
             try:
                 ar = float(ar)
             except Exception:
                 continue
+            loc = it.get("iso_639_1") or "und"
             cur = best.get(loc)
             if cur is None or ar < cur[1]:
                 best[loc] = (fp, ar)
@@ -132,9 +166,9 @@ def fetch_images(session_factory, limiter: RateLimiter, auth: Tuple[str, str], m
     return (media_type, tmdb_id, None)
 
 
-def fetch_translations(session_factory, limiter: RateLimiter, auth: Tuple[str, str], media_type: str, tmdb_id: int):
-    limiter.wait()
-    url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}/translations"
+def fetch_translations(pool: urllib3.PoolManager, limiter: AdaptiveLimiter, auth: Tuple[str, str], media_type: str, tmdb_id: int):
+    limiter.proceed()
+    url = TMDB_TRANSLATIONS_URL % (media_type, tmdb_id)
     headers = {"accept": "application/json"}
     params = None
     if auth[0] == "bearer":
@@ -144,32 +178,33 @@ def fetch_translations(session_factory, limiter: RateLimiter, auth: Tuple[str, s
 
     for attempt in range(6):
         try:
-            r = session_factory().get(url, headers=headers, params=params, timeout=25)
-        except requests.RequestException:
-            time.sleep(0.5 * (2**attempt))
+            r = pool.request("GET", url, fields=params, headers=headers, timeout=25)
+        except urllib3.exceptions.HTTPError:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
 
-        if r.status_code == 429:
+        limiter.observe(r.status, r.headers)
+        if r.status == 429:
             ra = r.headers.get("Retry-After")
-            time.sleep(float(ra) if ra and ra.isdigit() else 1.0)
+            time.sleep(min(float(ra), 30.0) if ra and ra.isdigit() else 1.0)
             continue
-        if 500 <= r.status_code < 600:
-            time.sleep(0.5 * (2**attempt))
+        if 500 <= r.status < 600:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code != 200:
+        if r.status != 200:
             return (media_type, tmdb_id, None)
 
         try:
-            return (media_type, tmdb_id, r.json())
+            return (media_type, tmdb_id, orjson.loads(r.data))
         except ValueError:
             return (media_type, tmdb_id, None)
 
     return (media_type, tmdb_id, None)
 
 
-def fetch_tv_details(session_factory, limiter: RateLimiter, auth: Tuple[str, str], series_id: int, lang: str):
-    limiter.wait()
-    url = f"https://api.themoviedb.org/3/tv/{series_id}"
+def fetch_tv_details(pool: urllib3.PoolManager, limiter: AdaptiveLimiter, auth: Tuple[str, str], series_id: int, lang: str):
+    limiter.proceed()
+    url = TMDB_TV_URL % series_id
     headers = {"accept": "application/json"}
     params = {"language": lang}
     if auth[0] == "bearer":
@@ -179,31 +214,32 @@ def fetch_tv_details(session_factory, limiter: RateLimiter, auth: Tuple[str, str
 
     for attempt in range(6):
         try:
-            r = session_factory().get(url, headers=headers, params=params, timeout=25)
-        except requests.RequestException:
-            time.sleep(0.5 * (2**attempt))
+            r = pool.request("GET", url, fields=params, headers=headers, timeout=25)
+        except urllib3.exceptions.HTTPError:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code == 429:
+        limiter.observe(r.status, r.headers)
+        if r.status == 429:
             ra = r.headers.get("Retry-After")
-            time.sleep(float(ra) if ra and ra.isdigit() else 1.0)
+            time.sleep(min(float(ra), 30.0) if ra and ra.isdigit() else 1.0)
             continue
-        if 500 <= r.status_code < 600:
-            time.sleep(0.5 * (2**attempt))
+        if 500 <= r.status < 600:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code != 200:
+        if r.status != 200:
             return (series_id, None)
         try:
-            return (series_id, r.json())
+            return (series_id, orjson.loads(r.data))
         except ValueError:
             return (series_id, None)
     return (series_id, None)
 
 
-def fetch_tv_season(session_factory, limiter: RateLimiter, auth: Tuple[str, str], series_id: int, season_number: int, lang: str):
-    limiter.wait()
-    url = f"https://api.themoviedb.org/3/tv/{series_id}/season/{season_number}"
+def fetch_tv_seasons_batch(pool: urllib3.PoolManager, limiter: AdaptiveLimiter, auth: Tuple[str, str], series_id: int, season_numbers: List[int], lang: str):
+    limiter.proceed()
+    url = TMDB_TV_URL % series_id
     headers = {"accept": "application/json"}
-    params = {"language": lang}
+    params = {"language": lang, "append_to_response": ",".join(f"season/{sn}" for sn in season_numbers)}
     if auth[0] == "bearer":
         headers["Authorization"] = f"Bearer {auth[1]}"
     else:
@@ -211,24 +247,26 @@ def fetch_tv_season(session_factory, limiter: RateLimiter, auth: Tuple[str, str]
 
     for attempt in range(6):
         try:
-            r = session_factory().get(url, headers=headers, params=params, timeout=25)
-        except requests.RequestException:
-            time.sleep(0.5 * (2**attempt))
+            r = pool.request("GET", url, fields=params, headers=headers, timeout=25)
+        except urllib3.exceptions.HTTPError:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code == 429:
+        limiter.observe(r.status, r.headers)
+        if r.status == 429:
             ra = r.headers.get("Retry-After")
-            time.sleep(float(ra) if ra and ra.isdigit() else 1.0)
+            time.sleep(min(float(ra), 30.0) if ra and ra.isdigit() else 1.0)
             continue
-        if 500 <= r.status_code < 600:
-            time.sleep(0.5 * (2**attempt))
+        if 500 <= r.status < 600:
+            time.sleep(min(10.0, 0.5 * (2**attempt)) * (0.5 + random.random()))
             continue
-        if r.status_code != 200:
-            return (series_id, season_number, None)
+        if r.status != 200:
+            return (series_id, None)
         try:
-            return (series_id, season_number, r.json())
+            data = orjson.loads(r.data)
         except ValueError:
-            return (series_id, season_number, None)
-    return (series_id, season_number, None)
+            return (series_id, None)
+        return (series_id, {sn: data.get(f"season/{sn}") for sn in season_numbers})
+    return (series_id, None)
 
 
 def iso(d: date) -> str:
@@ -250,10 +288,71 @@ def ensure_col(con: sqlite3.Connection, table: str, col: str, decl: str):
         pass
 
 
-def upsert(con: sqlite3.Connection, table: str, rows: List[Dict[str, object]]):
+TMDB_IMAGES_URL = "https://api.themoviedb.org/3/%s/%d/images"
+TMDB_TRANSLATIONS_URL = "https://api.themoviedb.org/3/%s/%d/translations"
+TMDB_TV_URL = "https://api.themoviedb.org/3/tv/%d"
+TMDB_DISCOVER_URL = "https://api.themoviedb.org/3/discover/%s"
+
+SQL_UPDATE_MOVIE_LOGOS = "UPDATE movies SET logos_json=? WHERE id=?"
+SQL_UPDATE_SERIES_LOGOS = "UPDATE series SET logos_json=? WHERE id=?"
+SQL_UPSERT_TRANS = """
+INSERT INTO title_translations(media_type, tmdb_id, iso_639_1, iso_3166_1, title, overview, tagline, homepage)
+VALUES(?,?,?,?,?,?,?,?)
+ON CONFLICT(media_type, tmdb_id, iso_639_1, iso_3166_1) DO UPDATE SET
+  title=excluded.title,
+  overview=excluded.overview,
+  tagline=excluded.tagline,
+  homepage=excluded.homepage
+""".strip()
+SQL_UPSERT_TRANS_DONE = """
+INSERT INTO title_translations_done(media_type, tmdb_id, fetched_at)
+VALUES(?,?,?)
+ON CONFLICT(media_type, tmdb_id) DO UPDATE SET fetched_at=excluded.fetched_at
+""".strip()
+SQL_UPSERT_SEASONS = """
+INSERT INTO tv_seasons(series_id, season_number, season_id, name, overview, air_date, poster_path, episode_count)
+VALUES(?,?,?,?,?,?,?,?)
+ON CONFLICT(series_id, season_number) DO UPDATE SET
+  season_id=excluded.season_id,
+  name=excluded.name,
+  overview=excluded.overview,
+  air_date=excluded.air_date,
+  poster_path=excluded.poster_path,
+  episode_count=excluded.episode_count
+""".strip()
+SQL_UPSERT_EPISODES = """
+INSERT INTO tv_episodes(series_id, season_number, episode_number, episode_id, name, overview, air_date, runtime, still_path, vote_average, vote_count)
+VALUES(?,?,?,?,?,?,?,?,?,?,?)
+ON CONFLICT(series_id, season_number, episode_number) DO UPDATE SET
+  episode_id=excluded.episode_id,
+  name=excluded.name,
+  overview=excluded.overview,
+  air_date=excluded.air_date,
+  runtime=excluded.runtime,
+  still_path=excluded.still_path,
+  vote_average=excluded.vote_average,
+  vote_count=excluded.vote_count
+""".strip()
+SQL_UPSERT_SEASON_DONE = """
+INSERT INTO tv_season_done(series_id, season_number, fetched_at)
+VALUES(?,?,?)
+ON CONFLICT(series_id, season_number) DO UPDATE SET fetched_at=excluded.fetched_at
+""".strip()
+
+@lru_cache(maxsize=64)
+def _multirow_sql(sql: str, n: int) -> str:
+    i = sql.index("VALUES(")
+    j = sql.index(")", i)
+    row_ph = sql[i + 6 : j + 1]
+    return sql[:i] + "VALUES " + ",".join([row_ph] * n) + sql[j + 1 :]
+
+
+_upsert_sql_cache: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+
+def upsert(con: sqlite3.Connection, table: str, rows: List[Dict[str, object]], cols: List[str]):
     if not rows:
         return 0
-    cols = [r[1] for r in con.execute(f"PRAGMA table_info({table})")]
     colset = set(cols)
     keys = [k for k in rows[0].keys() if k in colset and k != "logos_json"]
     if "id" not in keys:
@@ -262,14 +361,17 @@ def upsert(con: sqlite3.Connection, table: str, rows: List[Dict[str, object]]):
     if not keys:
         return 0
 
-    ph = ",".join("?" for _ in keys)
-    cl = ",".join(keys)
-    upd = ",".join(f"{k}=excluded.{k}" for k in keys if k != "id")
-
-    con.executemany(
-        f"INSERT INTO {table}({cl}) VALUES({ph}) ON CONFLICT(id) DO UPDATE SET {upd}",
-        [[r.get(k) for k in keys] for r in rows],
-    )
+    key_t = tuple(keys)
+    sql = _upsert_sql_cache.get((table, key_t))
+    if sql is None:
+        ph = ",".join("?" for _ in keys)
+        cl = ",".join(keys)
+        upd = ",".join(f"{k}=excluded.{k}" for k in keys if k != "id")
+        sql = f"INSERT INTO {table}({cl}) VALUES({ph}) ON CONFLICT(id) DO UPDATE SET {upd}"
+        _upsert_sql_cache[(table, key_t)] = sql
+
+    getk = itemgetter(*keys)
+    con.executemany(sql, (getk(r) if len(keys) > 1 else (r[keys[0]],) for r in rows))
     return len(rows)
 
 
@@ -289,10 +391,15 @@ def main() -> int:
         print(f"missing catalog sqlite: {db_path}", file=sys.stderr)
         return 1
 
-    con = sqlite3.connect(db_path)
+    con = sqlite3.connect(db_path, cached_statements=256)
+    con.isolation_level = None
     con.execute("PRAGMA journal_mode=WAL")
-    con.execute("PRAGMA synchronous=OFF")
+    con.execute("PRAGMA synchronous=NORMAL")
     con.execute("PRAGMA busy_timeout=30000")
+    con.execute("PRAGMA temp_store=MEMORY")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA wal_autocheckpoint=10000")
 
     tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
     if "movies" not in tables or "series" not in tables:
@@ -394,6 +501,8 @@ def main() -> int:
         """.strip()
     )
 
+    schema = {t: [r[1] for r in con.execute(f"PRAGMA table_info({t})")] for t in ("movies", "series")}
+
     window_days = int(float(env.get("TMDB_WINDOW_DAYS") or "7"))
     region = (env.get("TMDB_REGION") or "").strip() or None
     lang = (env.get("TMDB_LANGUAGE") or "en-US").strip() or "en-US"
@@ -404,35 +513,28 @@ def main() -> int:
     start = today - timedelta(days=window_days)
     end = today + timedelta(days=1)
 
-    sess = requests.Session()
+    workers = 50
+    limiter = AdaptiveLimiter()
+
+    pool = urllib3.PoolManager(num_pools=4, maxsize=workers, retries=False)
 
-    movie_ids: List[int] = []
-    tv_ids: List[int] = []
+    movie_id_set: set[int] = set()
+    tv_id_set: set[int] = set()
 
     movie_rows = 0
     tv_rows = 0
 
-    page = 1
-    while page <= max_pages:
-        params = {
-            "sort_by": "primary_release_date.desc",
-            "primary_release_date.gte": iso(start),
-            "primary_release_date.lte": iso(end),
-            "vote_count.gte": str(min_movie_votes),
-            "include_adult": "false",
-            "language": lang,
-            "page": str(page),
-        }
-        if region:
-            params["region"] = region
-        r = tmdb_get(sess, auth, "https://api.themoviedb.org/3/discover/movie", params)
-        if not r or r.status_code != 200:
-            break
-        data = r.json() or {}
-        results = data.get("results") or []
-        if not results:
-            break
-
+    def fetch_discover(kind: str, params_base: Dict[str, str], page: int):
+        limiter.proceed()
+        p = dict(params_base)
+        p["page"] = str(page)
+        r = tmdb_get(pool, auth, TMDB_DISCOVER_URL % kind, p, limiter)
+        if not r or r.status != 200:
+            return (page, None, 0)
+        data = orjson.loads(r.data) or {}
+        return (page, data.get("results") or [], int(data.get("total_pages") or 0))
+
+    def movie_rows_from(results) -> List[Dict[str, object]]:
         rows = []
         for m in results:
             if not isinstance(m, dict):
@@ -442,7 +544,7 @@ def main() -> int:
                 continue
             if int(m.get("vote_count") or 0) < min_movie_votes:
                 continue
-            movie_ids.append(mid)
+            movie_id_set.add(mid)
             rows.append(
                 {
                     "id": mid,
@@ -459,33 +561,9 @@ def main() -> int:
                     "poster_path": m.get("poster_path") or None,
                 }
             )
+        return rows
 
-        movie_rows += upsert(con, "movies", rows)
-
-        total_pages = int(data.get("total_pages") or 0)
-        if total_pages and page >= total_pages:
-            break
-        page += 1
-
-    page = 1
-    while page <= max_pages:
-        params = {
-            "sort_by": "first_air_date.desc",
-            "first_air_date.gte": iso(start),
-            "first_air_date.lte": iso(end),
-            "language": lang,
-            "page": str(page),
-        }
-        if region:
-            params["region"] = region
-        r = tmdb_get(sess, auth, "https://api.themoviedb.org/3/discover/tv", params)
-        if not r or r.status_code != 200:
-            break
-        data = r.json() or {}
-        results = data.get("results") or []
-        if not results:
-            break
-
+    def tv_rows_from(results) -> List[Dict[str, object]]:
         rows = []
         for t in results:
             if not isinstance(t, dict):
@@ -493,7 +571,7 @@ def main() -> int:
             tid = int(t.get("id") or 0)
             if tid <= 0:
                 continue
-            tv_ids.append(tid)
+            tv_id_set.add(tid)
             rows.append(
                 {
                     "id": tid,
@@ -509,49 +587,82 @@ def main() -> int:
                     "original_name": t.get("original_name") or None,
                 }
             )
+        return rows
+
+    params_movie = {
+        "sort_by": "primary_release_date.desc",
+        "primary_release_date.gte": iso(start),
+        "primary_release_date.lte": iso(end),
+        "vote_count.gte": str(min_movie_votes),
+        "include_adult": "false",
+        "language": lang,
+    }
+    params_tv = {
+        "sort_by": "first_air_date.desc",
+        "first_air_date.gte": iso(start),
+        "first_air_date.lte": iso(end),
+        "language": lang,
+    }
+    if region:
+        params_movie["region"] = region
+        params_tv["region"] = region
+
+    for kind, params_base, rows_from, table in (
+        ("movie", params_movie, movie_rows_from, "movies"),
+        ("tv", params_tv, tv_rows_from, "series"),
+    ):
+        _page, results, total_pages = fetch_discover(kind, params_base, 1)
+        if not results:
+            continue
+        n = upsert(con, table, rows_from(results), schema[table])
+        if table == "movies":
+            movie_rows += n
+        else:
+            tv_rows += n
+        last = min(max_pages, total_pages or 1)
+        if last > 1:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                futs = [ex.submit(fetch_discover, kind, params_base, pg) for pg in range(2, last + 1)]
+                for fut in as_completed(futs):
+                    _pg, res, _tp = fut.result()
+                    if not res:
+                        continue
+                    n = upsert(con, table, rows_from(res), schema[table])
+                    if table == "movies":
+                        movie_rows += n
+                    else:
+                        tv_rows += n
 
-        tv_rows += upsert(con, "series", rows)
-
-        total_pages = int(data.get("total_pages") or 0)
-        if total_pages and page >= total_pages:
-            break
-        page += 1
+    movie_ids = sorted(movie_id_set)
+    tv_ids = sorted(tv_id_set)
 
-    movie_ids = sorted(set(movie_ids))
-    tv_ids = sorted(set(tv_ids))
+    def load_ids_temp(ids: List[int]):
+        con.execute("CREATE TEMP TABLE IF NOT EXISTS _ids(id INTEGER PRIMARY KEY)")
+        con.execute("DELETE FROM _ids")
+        con.executemany("INSERT OR IGNORE INTO _ids VALUES(?)", ((i,) for i in ids))
 
     def ids_missing_logos(table: str, ids: List[int]) -> List[int]:
         if not ids:
             return []
-        out: List[int] = []
-        for ch in chunk(ids, 900):
-            q = ",".join("?" for _ in ch)
-            out.extend(
-                [
-                    int(r[0])
-                    for r in con.execute(
-                        f"SELECT id FROM {table} WHERE id IN ({q}) AND (logos_json IS NULL OR logos_json='')",
-                        ch,
-                    )
-                ]
+        load_ids_temp(ids)
+        return [
+            int(r[0])
+            for r in con.execute(
+                f"SELECT t.id FROM {table} t JOIN _ids ON _ids.id=t.id WHERE t.logos_json IS NULL OR t.logos_json=''"
             )
-        return out
+        ]
 
     def ids_missing_trans(media_type: str, ids: List[int]) -> List[int]:
         if not ids:
             return []
-        have = set()
-        for ch in chunk(ids, 900):
-            q = ",".join("?" for _ in ch)
-            have.update(
-                [
-                    int(r[0])
-                    for r in con.execute(
-                        f"SELECT tmdb_id FROM title_translations_done WHERE media_type=? AND tmdb_id IN ({q})",
-                        [media_type, *ch],
-                    )
-                ]
+        load_ids_temp(ids)
+        have = {
+            int(r[0])
+            for r in con.execute(
+                "SELECT d.tmdb_id FROM title_translations_done d JOIN _ids ON _ids.id=d.tmdb_id WHERE d.media_type=?",
+                (media_type,),
             )
+        }
         return [i for i in ids if i not in have]
 
     need_movie_logos = ids_missing_logos("movies", movie_ids)
@@ -559,18 +670,6 @@ def main() -> int:
     need_movie_trans = ids_missing_trans("movie", movie_ids)
     need_tv_trans = ids_missing_trans("tv", tv_ids)
 
-    rps = 47
-    workers = 50
-    limiter = RateLimiter(rps)
-    tls = local()
-
-    def session_factory() -> requests.Session:
-        s = getattr(tls, "s", None)
-        if s is None:
-            s = requests.Session()
-            tls.s = s
-        return s
-
     movie_logos = 0
     tv_logos = 0
     movie_trans = 0
@@ -579,71 +678,98 @@ def main() -> int:
     tv_episodes = 0
 
     logo_updates: List[Tuple[str, int]] = []
+    series_logo_updates: List[Tuple[str, int]] = []
     trans_rows: List[Tuple[str, int, str, str, str, str, str, str]] = []
     trans_done: List[Tuple[str, int, int]] = []
 
+    wq: queue.Queue = queue.Queue()
+
+    def writer_loop():
+        wcon = sqlite3.connect(db_path, cached_statements=256)
+        wcon.isolation_level = None
+        wcon.execute("PRAGMA busy_timeout=30000")
+        wcon.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            ops = wq.get()
+            if ops is None:
+                wq.task_done()
+                break
+            try:
+                wcon.execute("BEGIN IMMEDIATE")
+                for sql, batch in ops:
+                    if sql in (SQL_UPSERT_TRANS, SQL_UPSERT_EPISODES) and len(batch) > 1:
+                        for group in chunk(batch, 500):
+                            wcon.execute(_multirow_sql(sql, len(group)), [v for row in group for v in row])
+                    else:
+                        wcon.executemany(sql, batch)
+                wcon.execute("COMMIT")
+            except Exception:
+                try:
+                    wcon.execute("ROLLBACK")
+                except Exception:
+                    pass
+            finally:
+                wq.task_done()
+        wcon.close()
+
+    writer = Thread(target=writer_loop, daemon=True)
+    writer.start()
+
     def flush():
-        nonlocal logo_updates, trans_rows, trans_done
+        nonlocal logo_updates, series_logo_updates, trans_rows, trans_done
+        ops: List[Tuple[str, list]] = []
         if logo_updates:
-            con.executemany("UPDATE movies SET logos_json=? WHERE id=?", logo_updates)
+            ops.append((SQL_UPDATE_MOVIE_LOGOS, logo_updates))
             logo_updates = []
+        if series_logo_updates:
+            ops.append((SQL_UPDATE_SERIES_LOGOS, series_logo_updates))
+            series_logo_updates = []
         if trans_rows:
-            con.executemany(
-                """
-                INSERT INTO title_translations(media_type, tmdb_id, iso_639_1, iso_3166_1, title, overview, tagline, homepage)
-                VALUES(?,?,?,?,?,?,?,?)
-                ON CONFLICT(media_type, tmdb_id, iso_639_1, iso_3166_1) DO UPDATE SET
-                  title=excluded.title,
-                  overview=excluded.overview,
-                  tagline=excluded.tagline,
-                  homepage=excluded.homepage
-                """.strip(),
-                trans_rows,
-            )
+            ops.append((SQL_UPSERT_TRANS, trans_rows))
             trans_rows = []
         if trans_done:
-            con.executemany(
-                """
-                INSERT INTO title_translations_done(media_type, tmdb_id, fetched_at)
-                VALUES(?,?,?)
-                ON CONFLICT(media_type, tmdb_id) DO UPDATE SET fetched_at=excluded.fetched_at
-                """.strip(),
-                trans_done,
-            )
+            ops.append((SQL_UPSERT_TRANS_DONE, trans_done))
             trans_done = []
-        con.commit()
+        if ops:
+            wq.put(ops)
+
+    def run_logos(media_type: str, tmdb_id: int):
+        return ("L", *fetch_images(pool, limiter, auth, media_type, tmdb_id))
+
+    def run_trans(media_type: str, tmdb_id: int):
+        return ("T", *fetch_translations(pool, limiter, auth, media_type, tmdb_id))
 
     with ThreadPoolExecutor(max_workers=workers) as ex:
         futs = []
         for mid in need_movie_logos:
-            futs.append(ex.submit(fetch_images, session_factory, limiter, auth, "movie", mid))
+            futs.append(ex.submit(run_logos, "movie", mid))
         for tid in need_tv_logos:
-            futs.append(ex.submit(fetch_images, session_factory, limiter, auth, "tv", tid))
+            futs.append(ex.submit(run_logos, "tv", tid))
         for mid in need_movie_trans:
-            futs.append(ex.submit(fetch_translations, session_factory, limiter, auth, "movie", mid))
+            futs.append(ex.submit(run_trans, "movie", mid))
         for tid in need_tv_trans:
-            futs.append(ex.submit(fetch_translations, session_factory, limiter, auth, "tv", tid))
+            futs.append(ex.submit(run_trans, "tv", tid))
 
         for fut in as_completed(futs):
             res = fut.result()
             now = int(time.time())
 
-            if len(res) == 3 and res[0] in ("movie", "tv") and isinstance(res[2], dict) and "translations" not in res[2]:
-                media_type, tid, best = res
+            if res[0] == "L":
+                _tag, media_type, tid, best = res
                 if best:
-                    s = json.dumps({k: v[0] for k, v in best.items() if isinstance(v, (list, tuple)) and v}, separators=(",", ":"))
+                    s = orjson.dumps({k: v[0] for k, v in best.items() if isinstance(v, (list, tuple)) and v}).decode()
                     if s != "{}":
                         if media_type == "movie":
                             logo_updates.append((s, tid))
                             movie_logos += 1
                         else:
-                            con.execute("UPDATE series SET logos_json=? WHERE id=?", (s, tid))
+                            series_logo_updates.append((s, tid))
                             tv_logos += 1
-                if (len(logo_updates) + len(trans_rows) + len(trans_done)) >= 2000:
+                if (len(logo_updates) + len(series_logo_updates) + len(trans_rows) + len(trans_done)) >= 2000:
                     flush()
                 continue
 
-            media_type, tid, data = res
+            _tag, media_type, tid, data = res
             if isinstance(data, dict):
                 for t in data.get("translations") or []:
                     if not isinstance(t, dict):
@@ -666,7 +792,7 @@ def main() -> int:
             else:
                 tv_trans += 1
 
-            if (len(logo_updates) + len(trans_rows) + len(trans_done)) >= 2000:
+            if (len(logo_updates) + len(series_logo_updates) + len(trans_rows) + len(trans_done)) >= 2000:
                 flush()
 
     flush()
@@ -683,8 +809,9 @@ def main() -> int:
 
     seasons_to_fetch: List[Tuple[int, int]] = []
     if series_for_eps:
+        season_rows: List[Tuple] = []
         with ThreadPoolExecutor(max_workers=workers) as ex:
-            futs = [ex.submit(fetch_tv_details, session_factory, limiter, auth, sid, lang) for sid in series_for_eps]
+            futs = [ex.submit(fetch_tv_details, pool, limiter, auth, sid, lang) for sid in series_for_eps]
             for fut in as_completed(futs):
                 sid, data = fut.result()
                 if not (data and isinstance(data, dict)):
@@ -699,18 +826,7 @@ def main() -> int:
                         sn = int(sn)
                     except Exception:
                         continue
-                    con.execute(
-                        """
-                        INSERT INTO tv_seasons(series_id, season_number, season_id, name, overview, air_date, poster_path, episode_count)
-                        VALUES(?,?,?,?,?,?,?,?)
-                        ON CONFLICT(series_id, season_number) DO UPDATE SET
-                          season_id=excluded.season_id,
-                          name=excluded.name,
-                          overview=excluded.overview,
-                          air_date=excluded.air_date,
-                          poster_path=excluded.poster_path,
-                          episode_count=excluded.episode_count
-                        """.strip(),
+                    season_rows.append(
                         (
                             sid,
                             sn,
@@ -720,14 +836,17 @@ def main() -> int:
                             s.get("air_date"),
                             s.get("poster_path"),
                             s.get("episode_count"),
-                        ),
+                        )
                     )
                     tv_seasons += 1
                     if not con.execute(
                         "SELECT 1 FROM tv_season_done WHERE series_id=? AND season_number=? LIMIT 1", (sid, sn)
                     ).fetchone():
                         seasons_to_fetch.append((sid, sn))
-        con.commit()
+        if season_rows:
+            con.execute("BEGIN IMMEDIATE")
+            con.executemany(SQL_UPSERT_SEASONS, season_rows)
+            con.execute("COMMIT")
 
     if seasons_to_fetch:
         ep_rows: List[Tuple[int, int, int, int, str, str, str, int, str, float, int]] = []
@@ -735,46 +854,34 @@ def main() -> int:
 
         def flush_eps():
             nonlocal ep_rows, done_rows
+            ops: List[Tuple[str, list]] = []
             if ep_rows:
-                con.executemany(
-                    """
-                    INSERT INTO tv_episodes(series_id, season_number, episode_number, episode_id, name, overview, air_date, runtime, still_path, vote_average, vote_count)
-                    VALUES(?,?,?,?,?,?,?,?,?,?,?)
-                    ON CONFLICT(series_id, season_number, episode_number) DO UPDATE SET
-                      episode_id=excluded.episode_id,
-                      name=excluded.name,
-                      overview=excluded.overview,
-                      air_date=excluded.air_date,
-                      runtime=excluded.runtime,
-                      still_path=excluded.still_path,
-                      vote_average=excluded.vote_average,
-                      vote_count=excluded.vote_count
-                    """.strip(),
-                    ep_rows,
-                )
+                ops.append((SQL_UPSERT_EPISODES, ep_rows))
                 ep_rows = []
             if done_rows:
-                con.executemany(
-                    """
-                    INSERT INTO tv_season_done(series_id, season_number, fetched_at)
-                    VALUES(?,?,?)
-                    ON CONFLICT(series_id, season_number) DO UPDATE SET fetched_at=excluded.fetched_at
-                    """.strip(),
-                    done_rows,
-                )
+                ops.append((SQL_UPSERT_SEASON_DONE, done_rows))
                 done_rows = []
-            con.commit()
+            if ops:
+                wq.put(ops)
+
+        by_series: Dict[int, List[int]] = {}
+        for sid, sn in seasons_to_fetch:
+            by_series.setdefault(sid, []).append(sn)
 
         with ThreadPoolExecutor(max_workers=workers) as ex:
-            futs = {
-                ex.submit(fetch_tv_season, session_factory, limiter, auth, sid, sn, lang): (sid, sn)
-                for (sid, sn) in seasons_to_fetch
-            }
+            futs = [
+                ex.submit(fetch_tv_seasons_batch, pool, limiter, auth, sid, ch, lang)
+                for sid, sns in by_series.items()
+                for ch in chunk(sns, 20)
+            ]
             for fut in as_completed(futs):
-                sid, sn = futs[fut]
-                _sid, _sn, data = fut.result()
+                sid, seasons_data = fut.result()
                 now = int(time.time())
-                if data and isinstance(data, dict):
+                if not seasons_data:
+                    continue
+                for sn, data in seasons_data.items():
+                    if not (data and isinstance(data, dict)):
+                        continue
                     for e in data.get("episodes") or []:
                         if not isinstance(e, dict):
                             continue
@@ -806,11 +913,31 @@ def main() -> int:
                     flush_eps()
         flush_eps()
 
+    wq.join()
+    wq.put(None)
+    writer.join()
+
+    if "pop_rank" in schema["movies"] and "pop_rank" in schema["series"]:
+        ranked: List[Tuple[str, int, float]] = []
+        for table in ("movies", "series"):
+            ranked.extend(
+                (table, int(r[0]), float(r[1] or 0.0)) for r in con.execute(f"SELECT id, popularity FROM {table}")
+            )
+        ranked.sort(key=lambda t: -t[2])
+        rank_updates: Dict[str, List[Tuple[int, int]]] = {"movies": [], "series": []}
+        for rank, (table, tid, _pop) in enumerate(ranked):
+            rank_updates[table].append((rank, tid))
+        con.execute("BEGIN IMMEDIATE")
+        for table, batch in rank_updates.items():
+            con.executemany(f"UPDATE {table} SET pop_rank=? WHERE id=?", batch)
+        con.execute("COMMIT")
+
     con.execute(
         "INSERT INTO sync_runs(ran_at, window_days, region, movie_rows, tv_rows, movie_logos, tv_logos, movie_trans, tv_trans, tv_seasons, tv_episodes) VALUES(?,?,?,?,?,?,?,?,?,?,?)",
         (int(time.time()), window_days, region, movie_rows, tv_rows, movie_logos, tv_logos, movie_trans, tv_trans, tv_seasons, tv_episodes),
     )
-    con.commit()
+    con.execute("PRAGMA optimize")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
     con.close()
 
     print(
@@ -1,76 +1,84 @@
 #!/usr/bin/env python3
 import json
 import os
+import re
+import shutil
 import subprocess
 import sys
 import tempfile
 from urllib.parse import parse_qs, unquote, urlparse
 
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
+_XRAY_HINT_RE = re.compile(r'"outbounds".*?"inbounds"|"inbounds".*?"outbounds"', re.S)
+
+
+_ENV_RE = re.compile(
+    r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:\"([^\"\n]*)\"|'([^'\n]*)'|([^\n]*?))[ \t\r]*$",
+    re.M,
+)
+
 
 def _load_env(path: str):
-    out = {}
     try:
         with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                s = line.strip()
-                if not s or s.startswith("#") or "=" not in s:
-                    continue
-                k, v = s.split("=", 1)
-                k = k.strip()
-                v = v.strip().strip('"').strip("'")
-                if k:
-                    out[k] = v
+            text = f.read()
     except FileNotFoundError:
-        pass
+        return {}
+    out = {}
+    for m in _ENV_RE.finditer(text):
+        dq, sq, bare = m.group(2), m.group(3), m.group(4)
+        out[m.group(1)] = dq if dq is not None else (sq if sq is not None else (bare or ""))
     return out
 
 
 def _find_str(obj, pred):
-    if isinstance(obj, str):
-        return obj if pred(obj) else None
-    if isinstance(obj, dict):
-        for v in obj.values():
-            r = _find_str(v, pred)
-            if r:
-                return r
-    if isinstance(obj, list):
-        for v in obj:
-            r = _find_str(v, pred)
-            if r:
-                return r
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        t = type(o)
+        if t is str:
+            if pred(o):
+                return o
+        elif t is dict:
+            stack.extend(reversed(list(o.values())))
+        elif t is list:
+            stack.extend(reversed(o))
     return None
 
 
 def _maybe_json(s: str):
     s = (s or "").strip()
-    if not s or not s.startswith("{") or "outbounds" not in s or "inbounds" not in s:
+    if not s or not s.startswith("{") or not _XRAY_HINT_RE.search(s):
         return None
     try:
-        return json.loads(s)
+        return _orjson.loads(s) if _orjson else json.loads(s)
     except Exception:
         return None
 
 
 def _find_xray_config(obj):
-    if isinstance(obj, dict):
-        if isinstance(obj.get("outbounds"), list) and isinstance(obj.get("inbounds"), list):
-            return obj
-        for v in obj.values():
-            if isinstance(v, str):
-                j = _maybe_json(v)
-                if isinstance(j, dict):
-                    r = _find_xray_config(j)
-                    if r:
-                        return r
-        for v in obj.values():
-            r = _find_xray_config(v)
-            if r:
-                return r
-    if isinstance(obj, list):
-        for v in obj:
-            r = _find_xray_config(v)
-            if r:
-                return r
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        t = type(o)
+        if t is dict:
+            if isinstance(o.get("outbounds"), list) and isinstance(o.get("inbounds"), list):
+                return o
+            vals = list(o.values())
+            stack.extend(reversed(vals))
+            # embedded-JSON strings are tried before the plain children, so
+            # they go on top of the stack
+            for v in reversed(vals):
+                if type(v) is str:
+                    j = _maybe_json(v)
+                    if type(j) is dict:
+                        stack.append(j)
+        elif t is list:
+            stack.extend(reversed(o))
     return None
 
 
@@ -80,21 +88,28 @@ def _parse_vless(vless_url: str):
         return None
     if not u.hostname or not u.port or not u.username:
         return None
-    qs = parse_qs(u.query or "")
-    q = {k: (v[0] if v else "") for k, v in qs.items()}
-    security = (q.get("security") or "").strip().lower()
-    net = (q.get("type") or "tcp").strip().lower() or "tcp"
-    flow = (q.get("flow") or "").strip()
-    sni = (q.get("sni") or q.get("serverName") or "").strip()
-    fp = (q.get("fp") or "").strip()
-    pbk = (q.get("pbk") or q.get("publicKey") or "").strip()
-    sid = (q.get("sid") or q.get("shortId") or "").strip()
-    spx = (q.get("spx") or q.get("spiderX") or "").strip()
-    alpn = (q.get("alpn") or "").strip()
-    path = (q.get("path") or u.path or "").strip()
+    qs = parse_qs(u.query or "", keep_blank_values=True)
+
+    def g(*keys: str) -> str:
+        for k in keys:
+            v = qs.get(k)
+            if v and v[0]:
+                return v[0].strip()
+        return ""
+
+    security = g("security").lower()
+    net = g("type").lower() or "tcp"
+    flow = g("flow")
+    sni = g("sni", "serverName")
+    fp = g("fp")
+    pbk = g("pbk", "publicKey")
+    sid = g("sid", "shortId")
+    spx = g("spx", "spiderX")
+    alpn = g("alpn")
+    path = g("path") or (u.path or "").strip()
     if path and not path.startswith("/"):
         path = "/" + path
-    host_hdr = (q.get("host") or "").strip()
+    host_hdr = g("host")
 
     stream = {"network": net}
     if security in ("tls", "reality"):
@@ -128,7 +143,7 @@ def _parse_vless(vless_url: str):
             ws["headers"] = {"Host": host_hdr}
         stream["wsSettings"] = ws
     if net == "grpc":
-        svc = (q.get("serviceName") or "").strip()
+        svc = g("serviceName")
         if svc:
             stream["grpcSettings"] = {"serviceName": svc}
 
@@ -152,10 +167,14 @@ def _parse_vless(vless_url: str):
     }
 
 
+_NON_PROXY_PROTOS = frozenset(("freedom", "direct", "blackhole", "dns"))
+_PASSIVE_PROTOS = frozenset(("freedom", "blackhole", "dns"))
+
+
 def _pick_outbound_tag(outbounds: list[dict]):
     for ob in outbounds:
         proto = (ob.get("protocol") or "").lower()
-        if proto in ("freedom", "direct", "blackhole", "dns"):
+        if proto in _NON_PROXY_PROTOS:
             continue
         tag = (ob.get("tag") or "").strip()
         if tag:
@@ -170,32 +189,29 @@ def _pick_outbound_tag(outbounds: list[dict]):
 def _normalize_outbounds(outbounds: list[dict]):
     out = []
     seen = set()
+    counters: dict[str, int] = {}
     proxy_set = False
+
+    def uniq(prefix: str) -> str:
+        i = counters.get(prefix, 1)
+        while f"{prefix}{i}" in seen:
+            i += 1
+        counters[prefix] = i + 1
+        return f"{prefix}{i}"
+
     for ob in outbounds:
         if not isinstance(ob, dict):
             continue
         tag = (ob.get("tag") or "").strip()
         proto = (ob.get("protocol") or "").lower()
         if not tag:
-            if not proxy_set and proto not in ("freedom", "blackhole", "dns"):
+            if not proxy_set and proto not in _PASSIVE_PROTOS:
                 tag = "proxy"
                 proxy_set = True
             else:
-                i = 1
-                while True:
-                    cand = f"out{i}"
-                    if cand not in seen:
-                        tag = cand
-                        break
-                    i += 1
+                tag = uniq("out")
         if tag in seen:
-            i = 1
-            while True:
-                cand = f"{tag}_{i}"
-                if cand not in seen:
-                    tag = cand
-                    break
-                i += 1
+            tag = uniq(f"{tag}_")
         ob = dict(ob)
         ob["tag"] = tag
         seen.add(tag)
@@ -275,17 +291,14 @@ def main() -> int:
         "routing": {"domainStrategy": "AsIs", "rules": [{"type": "field", "network": "tcp,udp", "outboundTag": tag}]},
     }
 
-    xray_path = env.get("XRAY_BIN") or "/usr/local/bin/xray"
-    if not os.path.isfile(xray_path):
-        xray_path = "/usr/bin/xray"
+    xray_path = env.get("XRAY_BIN") or shutil.which("xray") or "/usr/local/bin/xray"
     if not os.path.isfile(xray_path):
         return 6
 
-    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, suffix=".json") as f:
-        json.dump(xray_cfg, f, ensure_ascii=False, separators=(",", ":"))
-        f.flush()
-        os.fsync(f.fileno())
-        cfg_path = f.name
+    fd, cfg_path = tempfile.mkstemp(suffix=".json")
+    raw = _orjson.dumps(xray_cfg) if _orjson else json.dumps(xray_cfg, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    os.write(fd, raw)
+    os.close(fd)
 
     os.execv(xray_path, [xray_path, "run", "-c", cfg_path])
     return 0